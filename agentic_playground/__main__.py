@@ -0,0 +1,49 @@
+"""
+Command-line entrypoint for running examples.
+
+Usage:
+    python -m agentic_playground <example>
+
+Example:
+    python -m agentic_playground simple_conversation
+
+Async examples are run on uvloop when it is installed.
+"""
+
+import asyncio
+import importlib
+import pkgutil
+import sys
+
+from agentic_playground import examples
+from agentic_playground.runtime import install_event_loop, run
+
+
+def _example_names() -> list[str]:
+    """List the available example modules."""
+    return sorted(m.name for m in pkgutil.iter_modules(examples.__path__))
+
+
+def main(argv: list[str]) -> int:
+    """Run the example named in argv."""
+    names = _example_names()
+    if len(argv) != 1 or argv[0] not in names:
+        print("Usage: python -m agentic_playground <example>")
+        print("\nAvailable examples:")
+        for name in names:
+            print(f"  - {name}")
+        return 1
+
+    module = importlib.import_module(f"agentic_playground.examples.{argv[0]}")
+
+    if asyncio.iscoroutinefunction(module.main):
+        run(module.main())
+    else:
+        # Synchronous entrypoints (e.g. the web UI) create their own loops
+        install_event_loop()
+        module.main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -2,23 +2,157 @@
 Coordinator agent - demonstrates agent orchestration and delegation.
 """
 
-from typing import Optional
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Iterator, Optional
 from ..core import Agent, AgentConfig, Message, MessageType
 from ..llm import LLMProvider, LLMMessage
 
 
+class DelegationCache:
+    """
+    LRU cache of delegation decisions.
+
+    Recurring task texts are routed to the same agent without another LLM
+    round-trip. Keys are built from the normalized task text and the list of
+    available agents, so changing the agent pool never serves a stale choice.
+
+    Args:
+        max_size: Maximum number of cached decisions
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    @staticmethod
+    def make_key(task: str, agent_list: str) -> str:
+        """Build a cache key from the task text and the joined agent pool."""
+        normalized = " ".join(task.lower().split())
+        digest = hashlib.sha256(normalized.encode("utf-8"))
+        digest.update(b"\0" + agent_list.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached agent for a key, or None on a miss."""
+        agent_id = self._entries.get(key)
+        if agent_id is not None:
+            self._entries.move_to_end(key)
+        return agent_id
+
+    def put(self, key: str, agent_id: str) -> None:
+        """Cache the agent chosen for a key."""
+        self._entries[key] = agent_id
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached decisions."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class PendingTasks(MutableMapping):
+    """
+    Tasks awaiting a response, bounded by count and age.
+
+    A mapping from the id of the outstanding message to the original task:
+    the incoming task's own id until it is delegated, then the delegated
+    message's id. Responses that never arrive are dropped after ttl seconds,
+    and the oldest entries are evicted beyond max_size, so a long-running
+    coordinator does not grow forever.
+
+    Args:
+        max_size: Maximum number of tracked tasks
+        ttl: Seconds a task is tracked without a response
+    """
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        # Insertion order is also expiry order, so expired entries lead
+        self._entries: OrderedDict[str, tuple[float, Message]] = OrderedDict()
+
+    def __getitem__(self, key: str) -> Message:
+        self._expire()
+        return self._entries[key][1]
+
+    def __setitem__(self, key: str, task: Message) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic(), task)
+        self._expire()
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __delitem__(self, key: str) -> None:
+        del self._entries[key]
+
+    def _expire(self) -> None:
+        """Drop entries older than the TTL."""
+        cutoff = time.monotonic() - self.ttl
+        while self._entries:
+            added_at, _ = next(iter(self._entries.values()))
+            if added_at >= cutoff:
+                break
+            self._entries.popitem(last=False)
+
+    def __iter__(self) -> Iterator[str]:
+        self._expire()
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        self._expire()
+        return len(self._entries)
+
+
+# Matches status queries without lowercasing a copy of the whole message
+_STATUS_RE = re.compile(r"status", re.IGNORECASE)
+
+_STATUS_TEMPLATE = "Managing {} agents. {} pending tasks."
+
+_DELEGATION_PROMPT_PREFIX = (
+    "You are a coordinator agent. You need to delegate this task to one of "
+    "the available agents: {agent_list}\n\nTask: "
+)
+_DELEGATION_PROMPT_SUFFIX = (
+    "\n\nWhich agent should handle this task? Reply with just the agent name."
+)
+
+_BATCH_DELEGATION_PROMPT_PREFIX = (
+    "You are a coordinator agent. You need to delegate each of these tasks to "
+    "one of the available agents: {agent_list}\n\nTasks:\n"
+)
+_BATCH_DELEGATION_PROMPT_SUFFIX = (
+    "\n\nWhich agent should handle each task? Reply with one line per task "
+    "in the form '<task number>: <agent name>'."
+)
+
+# Parses "3: echo1", "3) echo1", "3. echo1" lines of a batch routing reply
+_BATCH_ANSWER_RE = re.compile(r"^\s*(\d+)\s*[:).-]\s*(\S+)", re.MULTILINE)
+
+
 class CoordinatorAgent(Agent):
     """
     A coordinator agent that can delegate tasks to other agents.
 
     This agent can optionally use an LLM to decide how to delegate tasks.
+    With a delegation_batch_window > 0, tasks arriving within that many
+    seconds of each other are routed together in a single LLM call.
     """
 
     def __init__(
         self,
         name: str = "coordinator",
         available_agents: Optional[list[str]] = None,
-        llm_provider: Optional[LLMProvider] = None
+        llm_provider: Optional[LLMProvider] = None,
+        delegation_batch_window: float = 0.0
     ):
         config = AgentConfig(
             name=name,
@@ -27,9 +161,42 @@ class CoordinatorAgent(Agent):
         )
         super().__init__(config)
 
-        self.available_agents = available_agents or []
+        self.available_agents: list[str] = available_agents or []
+        self._agent_snapshot: Optional[list[str]] = None
+        self._refresh_agent_pool()
         self.llm_provider = llm_provider
-        self.pending_tasks: dict[str, Message] = {}
+        self.pending_tasks = PendingTasks()
+        self.delegation_cache = DelegationCache()
+        self.delegation_batch_window = delegation_batch_window
+        self._pending_delegations: list[Message] = []
+        self._delegate_flush_task: Optional[asyncio.Task] = None
+
+    def _refresh_agent_pool(self) -> None:
+        """
+        Recompute what is derived from available_agents, if it changed.
+
+        available_agents is a plain list callers may edit in place; the set,
+        joined names and prompt prefixes are rebuilt only when it differs
+        from the last snapshot, rather than per delegated task.
+        """
+        agents = self.available_agents
+        if agents == self._agent_snapshot:
+            return
+        self._agent_snapshot = list(agents)
+        self._agent_set = frozenset(agents)
+        self._agent_list_str = ", ".join(agents)
+        self._prompt_prefix = _DELEGATION_PROMPT_PREFIX.format(
+            agent_list=self._agent_list_str
+        )
+        self._batch_prompt_prefix = _BATCH_DELEGATION_PROMPT_PREFIX.format(
+            agent_list=self._agent_list_str
+        )
+
+    async def stop(self) -> None:
+        """Stop the agent, routing any delegations still waiting in a batch."""
+        await super().stop()
+        if self._delegate_flush_task is not None:
+            await self._delegate_flush_task
 
     async def process_message(self, message: Message) -> None:
         """Process incoming messages and coordinate responses."""
@@ -53,17 +220,10 @@ class CoordinatorAgent(Agent):
         else:
             # Simple round-robin delegation
             if self.available_agents:
-                agent_id = self.available_agents[0]
-                delegate_msg = Message(
-                    type=MessageType.TASK,
-                    sender=self.id,
-                    recipient=agent_id,
-                    content=message.content,
-                    metadata={"delegated_from": message.id}
-                )
-                await self.send_message(delegate_msg)
+                await self._send_delegation(message, self.available_agents[0])
             else:
                 # No agents available, send back a response
+                self.pending_tasks.pop(message.id, None)
                 response = Message(
                     type=MessageType.RESPONSE,
                     sender=self.id,
@@ -76,67 +236,131 @@ class CoordinatorAgent(Agent):
     async def _llm_delegate_task(self, message: Message) -> None:
         """Use LLM to intelligently delegate a task."""
 
-        agent_list = ", ".join(self.available_agents)
-        prompt = f"""You are a coordinator agent. You need to delegate this task to one of the available agents: {agent_list}
+        self._refresh_agent_pool()
+        chosen_agent = self.delegation_cache.get(
+            DelegationCache.make_key(message.content, self._agent_list_str)
+        )
+        if chosen_agent is not None:
+            await self._send_delegation(message, chosen_agent)
+            return
+
+        if self.delegation_batch_window > 0:
+            # Coalesce with other tasks arriving within the window
+            self._pending_delegations.append(message)
+            if self._delegate_flush_task is None:
+                self._delegate_flush_task = asyncio.create_task(
+                    self._flush_delegations()
+                )
+            return
 
-Task: {message.content}
+        await self._route_batch([message])
 
-Which agent should handle this task? Reply with just the agent name."""
+    async def _flush_delegations(self) -> None:
+        """Wait out the batch window, then route everything collected."""
+        await asyncio.sleep(self.delegation_batch_window)
+        batch = self._pending_delegations
+        self._pending_delegations = []
+        self._delegate_flush_task = None
+        await self._route_batch(batch)
 
-        llm_message = LLMMessage(role="user", content=prompt)
+    async def _route_batch(self, messages: list[Message]) -> None:
+        """Choose an agent for each task with one LLM call and delegate them."""
 
+        # The pool may have changed while the batch was collected
+        self._refresh_agent_pool()
         try:
+            if len(messages) == 1:
+                prompt = (
+                    self._prompt_prefix + messages[0].content + _DELEGATION_PROMPT_SUFFIX
+                )
+                max_tokens = 50
+            else:
+                tasks = "\n".join(
+                    f"{i}) {msg.content}" for i, msg in enumerate(messages, 1)
+                )
+                prompt = self._batch_prompt_prefix + tasks + _BATCH_DELEGATION_PROMPT_SUFFIX
+                max_tokens = 20 * len(messages)
+
             response = await self.llm_provider.generate(
-                messages=[llm_message],
+                messages=[LLMMessage(role="user", content=prompt)],
                 temperature=0.3,
-                max_tokens=50
+                max_tokens=max_tokens
             )
 
-            # Extract agent name from response
-            chosen_agent = response.content.strip().lower()
+            # Extract agent names from response
+            if len(messages) == 1:
+                answers = {1: response.content.strip().lower()}
+            else:
+                answers = {
+                    int(num): agent.lower()
+                    for num, agent in _BATCH_ANSWER_RE.findall(response.content)
+                }
+        except Exception as e:
+            for message in messages:
+                await self._fail_delegation(message, e)
+            return
 
-            if chosen_agent in self.available_agents:
-                delegate_msg = Message(
-                    type=MessageType.TASK,
-                    sender=self.id,
-                    recipient=chosen_agent,
-                    content=message.content,
-                    metadata={"delegated_from": message.id}
+        for i, message in enumerate(messages, 1):
+            chosen_agent = answers.get(i)
+            if chosen_agent in self._agent_set:
+                self.delegation_cache.put(
+                    DelegationCache.make_key(message.content, self._agent_list_str),
+                    chosen_agent
                 )
-                await self.send_message(delegate_msg)
-            else:
+            elif self.available_agents:
                 # Fallback to first agent
-                delegate_msg = Message(
-                    type=MessageType.TASK,
-                    sender=self.id,
-                    recipient=self.available_agents[0],
-                    content=message.content,
-                    metadata={"delegated_from": message.id}
+                chosen_agent = self.available_agents[0]
+            else:
+                await self._fail_delegation(
+                    message, LookupError("no agents available")
                 )
-                await self.send_message(delegate_msg)
+                continue
 
-        except Exception as e:
-            error_msg = Message(
-                type=MessageType.ERROR,
-                sender=self.id,
-                recipient=message.sender,
-                content=f"Error delegating task: {str(e)}",
-                metadata={"error": str(e)}
-            )
-            await self.send_message(error_msg)
+            await self._send_delegation(message, chosen_agent)
+
+    async def _fail_delegation(self, message: Message, error: Exception) -> None:
+        """Drop a task that couldn't be delegated and report it to its sender."""
+        self.pending_tasks.pop(message.id, None)
+        error_msg = Message.error(
+            self.id, error, "Error delegating task",
+            recipient=message.sender, in_reply_to=message.id,
+        )
+        await self.send_message(error_msg)
+
+    async def _send_delegation(self, message: Message, agent_id: str) -> None:
+        """Forward a task to the chosen agent."""
+        delegate_msg = Message(
+            type=MessageType.TASK,
+            sender=self.id,
+            recipient=agent_id,
+            content=message.content,
+            metadata={"delegated_from": message.id}
+        )
+
+        # Track the task under the delegated message's id, which is what the
+        # agent's response will refer to
+        if self.pending_tasks.pop(message.id, None) is not None:
+            self.pending_tasks[delegate_msg.id] = message
+
+        await self.send_message(delegate_msg)
 
     async def _handle_response(self, message: Message) -> None:
         """Handle a response from a delegated agent."""
 
-        # Just forward the response to the original requester
-        # In a more complex system, you might aggregate responses
-        pass
+        # The task is no longer pending once its delegate has answered.
+        # In a more complex system, you might forward or aggregate responses
+        metadata = message.metadata
+        reply_to = metadata.get("in_reply_to") or metadata.get("original_message")
+        if reply_to:
+            self.pending_tasks.pop(reply_to, None)
 
     async def _handle_query(self, message: Message) -> None:
         """Handle a query about the coordinator's state."""
 
-        if "status" in message.content.lower():
-            status = f"Managing {len(self.available_agents)} agents. {len(self.pending_tasks)} pending tasks."
+        if _STATUS_RE.search(message.content):
+            status = _STATUS_TEMPLATE.format(
+                len(self.available_agents), len(self.pending_tasks)
+            )
             response = Message(
                 type=MessageType.RESPONSE,
                 sender=self.id,
@@ -5,6 +5,13 @@ Simple echo agent - demonstrates basic agent without LLM.
 from ..core import Agent, AgentConfig, Message, MessageType
 
 
+# Reply prefix for each message type the echo agent answers
+_REPLY_PREFIXES = {
+    MessageType.QUERY: "Echo: ",
+    MessageType.TASK: "Acknowledged task: ",
+}
+
+
 class EchoAgent(Agent):
     """
     A simple agent that echoes back any message it receives.
@@ -23,21 +30,17 @@ class EchoAgent(Agent):
     async def process_message(self, message: Message) -> None:
         """Echo the message back to the sender."""
 
-        if message.type == MessageType.QUERY:
-            response = Message(
-                type=MessageType.RESPONSE,
-                sender=self.id,
-                recipient=message.sender,
-                content=f"Echo: {message.content}",
-                metadata={"original_message": message.id}
-            )
-            await self.send_message(response)
-        elif message.type == MessageType.TASK:
-            response = Message(
-                type=MessageType.RESPONSE,
-                sender=self.id,
-                recipient=message.sender,
-                content=f"Acknowledged task: {message.content}",
-                metadata={"original_message": message.id}
-            )
-            await self.send_message(response)
+        # One dict lookup both filters message types and picks the reply;
+        # broadcasts, system messages, responses and errors are ignored
+        prefix = _REPLY_PREFIXES.get(message.type)
+        if prefix is None:
+            return
+
+        response = Message(
+            type=MessageType.RESPONSE,
+            sender=self.id,
+            recipient=message.sender,
+            content=prefix + message.content,
+            metadata={"original_message": message.id}
+        )
+        await self.send_message(response)
@@ -4,10 +4,11 @@ Base agent class for the multi-agent system.
 
 import asyncio
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import Optional, Callable, Awaitable, TYPE_CHECKING
 from pydantic import BaseModel, Field
 
-from .message import Message, MessageType
+from .message import Message
 
 if TYPE_CHECKING:
     from agentic_playground.memory import MemoryManager
@@ -38,7 +39,10 @@ class Agent(ABC):
     def __init__(self, config: AgentConfig):
         self.config = config
         self.id = config.name
-        self.inbox: asyncio.Queue[Message] = asyncio.Queue()
+        # Single-consumer inbox: only this agent's start() loop pops from it,
+        # so a deque plus a wake event replaces asyncio.Queue's futures
+        self.inbox: deque[Message] = deque()
+        self._inbox_event = asyncio.Event()
         self.running = False
         self.message_callback: Optional[Callable[[Message], Awaitable[None]]] = None
         self._state: dict = {}
@@ -54,8 +58,16 @@ class Agent(ABC):
         self, callback: Callable[[Message], Awaitable[None]]
     ) -> None:
         """Set callback for sending messages (typically set by orchestrator)."""
+        if not callable(callback):
+            raise TypeError(f"Message callback for agent {self.id} must be callable")
+
         self.message_callback = callback
 
+        # Bind the callback as send_message so sends skip the wrapper and its
+        # callback check, unless a subclass customized send_message
+        if type(self).send_message is Agent.send_message:
+            self.send_message = callback  # type: ignore[method-assign]
+
     def set_memory_manager(
         self, memory_manager: "MemoryManager", session_id: str
     ) -> None:
@@ -111,7 +123,18 @@ class Agent(ABC):
 
     async def receive_message(self, message: Message) -> None:
         """Receive a message into the inbox."""
-        await self.inbox.put(message)
+        self.deliver(message)
+
+    def deliver(self, message: Message) -> None:
+        """
+        Place a message directly into the inbox without awaiting.
+
+        This is the path the orchestrator uses for routing. Override this to
+        customize how messages are accepted; a receive_message override also
+        still works, but makes each delivery await it.
+        """
+        self.inbox.append(message)
+        self._inbox_event.set()
 
     @abstractmethod
     async def process_message(self, message: Message) -> None:
@@ -126,25 +149,29 @@ class Agent(ABC):
     async def start(self) -> None:
         """Start the agent's message processing loop."""
         self.running = True
+        inbox = self.inbox
+        wake = self._inbox_event
         while self.running:
-            try:
-                message = await asyncio.wait_for(self.inbox.get(), timeout=0.1)
-                await self.process_message(message)
-            except asyncio.TimeoutError:
-                continue
-            except Exception as e:
-                error_msg = Message(
-                    type=MessageType.ERROR,
-                    sender=self.id,
-                    content=f"Error processing message: {str(e)}",
-                    metadata={"error": str(e)}
-                )
-                if self.message_callback:
-                    await self.message_callback(error_msg)
+            # Sleep until deliver() or stop() sets the event, then drain the
+            # whole burst before waiting again
+            await wake.wait()
+            wake.clear()
+            while inbox and self.running:
+                message = inbox.popleft()
+                try:
+                    await self.process_message(message)
+                except Exception as e:
+                    error_msg = Message.error(
+                        self.id, e, "Error processing message",
+                        in_reply_to=message.id,
+                    )
+                    if self.message_callback:
+                        await self.message_callback(error_msg)
 
     async def stop(self) -> None:
         """Stop the agent's message processing loop."""
         self.running = False
+        self._inbox_event.set()
 
     def __str__(self) -> str:
         return f"Agent({self.id}, role={self.config.role})"
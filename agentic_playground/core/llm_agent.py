@@ -2,10 +2,24 @@
 LLM-powered agent implementation.
 """
 
-from typing import Optional
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Any, Optional, TYPE_CHECKING
 from .agent import Agent, AgentConfig
 from .message import Message, MessageType
 from ..llm import LLMProvider, LLMMessage
+from ..runtime import create_eager_task
+from ..memory.utils.tokens import (
+    estimate_message_tokens,
+    CONVERSATION_OVERHEAD_TOKENS,
+)
+
+if TYPE_CHECKING:
+    from agentic_playground.memory import MemoryManager
 
 
 class LLMAgent(Agent):
@@ -13,6 +27,21 @@ class LLMAgent(Agent):
     An agent that uses an LLM for reasoning and generating responses.
     """
 
+    # Conversation entries are persisted in the background, in batches of
+    # up to persist_batch_size or whatever arrived within the flush interval
+    persist_batch_size: int = 16
+    persist_flush_interval: float = 0.2
+
+    # Retrieved memories are reused for repeated message content (retries,
+    # reflection turns) for up to retrieval_cache_ttl seconds
+    retrieval_cache_size: int = 128
+    retrieval_cache_ttl: float = 60.0
+
+    # Optional bulkhead shared with other agents (set by the orchestrator)
+    # and a per-generation timeout in seconds
+    llm_semaphore: Optional[asyncio.Semaphore] = None
+    llm_timeout: Optional[float] = None
+
     def __init__(
         self,
         config: AgentConfig,
@@ -20,15 +49,35 @@ class LLMAgent(Agent):
         enable_context_management: bool = True,
         max_context_tokens: int = 180000,
         enable_memory_retrieval: bool = True,
+        max_history_messages: Optional[int] = None,
+        stream_responses: bool = False,
     ):
         super().__init__(config)
         self.llm_provider = llm_provider
         self.conversation_history: list[LLMMessage] = []
+        self.max_history_messages = max_history_messages
+        self.stream_responses = stream_responses
+        # Running token estimate of conversation_history, kept in sync on
+        # append/evict so the pruning check doesn't re-tokenize every turn
+        self._history_tokens = 0
+        # Number of system messages in conversation_history (they lead it)
+        self._system_count = 0
+        # Scratch list reused when memories are spliced into the history
+        self._send_buffer: list[LLMMessage] = []
+        # Background writer for conversation entries (runs while started)
+        self._persist_queue: asyncio.Queue[Optional[dict[str, Any]]] = asyncio.Queue()
+        self._persist_task: Optional[asyncio.Task] = None
+        # LRU of normalized-content digest -> (stored at, retrieved memories)
+        self._retrieval_cache: OrderedDict[bytes, tuple[float, list]] = OrderedDict()
         self.enable_context_management = enable_context_management
         self.enable_memory_retrieval = enable_memory_retrieval
         self.context_manager = None
         self.query_engine = None
         self.memory_retriever = None
+        # Whether to retrieve memories / persist conversation; derived from
+        # the settings above and refreshed by set_memory_manager
+        self._retrieval_active = False
+        self._persist_active = False
 
         # Initialize context manager if enabled
         if enable_context_management:
@@ -37,10 +86,38 @@ class LLMAgent(Agent):
 
         # Initialize with system prompt if provided
         if config.system_prompt:
-            self.conversation_history.append(
+            self._append_history(
                 LLMMessage(role="system", content=config.system_prompt)
             )
 
+    def set_memory_manager(
+        self, memory_manager: "MemoryManager", session_id: str
+    ) -> None:
+        """Set the memory manager, dropping memories cached from a previous one."""
+        super().set_memory_manager(memory_manager, session_id)
+        self._retrieval_cache.clear()
+        self._persist_active = bool(self.memory_manager and self.session_id)
+        self._retrieval_active = bool(
+            self.memory_retriever and self.enable_memory_retrieval and
+            self._persist_active
+        )
+
+    async def start(self) -> None:
+        """Start the message loop and the background conversation writer."""
+        if self._persist_task is None:
+            self._persist_task = create_eager_task(self._run_conversation_writer())
+        await super().start()
+
+    async def stop(self) -> None:
+        """Stop the message loop and flush pending conversation entries."""
+        await super().stop()
+
+        if self._persist_task is not None:
+            # The None sentinel makes the writer flush its batch and exit
+            self._persist_queue.put_nowait(None)
+            await self._persist_task
+            self._persist_task = None
+
     async def process_message(self, message: Message) -> None:
         """
         Process an incoming message using the LLM.
@@ -50,34 +127,27 @@ class LLMAgent(Agent):
         2. Generate a response using the LLM
         3. Send the response back to the sender or as specified
         4. Persist conversation to memory if enabled
+
+        Partial chunks of a streamed reply are ignored; the agent responds
+        once, to the final message carrying the full text.
         """
+        if message.is_stream_chunk:
+            return
 
         # Format the incoming message for the LLM
         user_message = self._format_message_for_llm(message)
-        self.conversation_history.append(user_message)
+        self._append_history(user_message)
 
         # Persist user message to memory if enabled
-        if self.memory_manager and self.session_id:
-            await self.memory_manager.store_conversation_entry(
-                agent_id=self.id,
-                session_id=self.session_id,
-                role="user",
-                content=user_message.content,
-                importance_score=0.5,
-            )
+        if self._persist_active:
+            await self._persist_conversation_entry("user", user_message.content)
 
         try:
             # Retrieve relevant memories if enabled
             retrieved_memories = []
-            if (self.memory_retriever and self.enable_memory_retrieval and
-                self.memory_manager and self.session_id):
+            if self._retrieval_active:
                 try:
-                    retrieved_memories = await self.memory_retriever.retrieve_for_message(
-                        agent_id=self.id,
-                        message_content=message.content,
-                        session_id=self.session_id,
-                        limit=3,
-                    )
+                    retrieved_memories = await self._retrieve_memories(message.content)
                     if retrieved_memories:
                         print(f"[{self.id}] Retrieved {len(retrieved_memories)} relevant memories")
                 except Exception as e:
@@ -87,25 +157,21 @@ class LLMAgent(Agent):
             messages_to_send = self.conversation_history
 
             if self.context_manager and self.enable_context_management:
-                # Convert to dict format for context manager
-                messages_dict = [
-                    {"role": msg.role, "content": msg.content}
-                    for msg in self.conversation_history
-                ]
-
-                # Convert memories to dict format
-                memories_dict = None
-                if retrieved_memories:
-                    memories_dict = [
-                        {
-                            "role": "system",
-                            "content": f"[Memory] {mem.content}"
-                        }
-                        for mem in retrieved_memories
+                # Check if pruning is needed
+                history_tokens = self._history_tokens + CONVERSATION_OVERHEAD_TOKENS
+                if self.context_manager.is_over_budget(history_tokens):
+                    # Convert to dict format for context manager
+                    messages_dict = [
+                        {"role": msg.role, "content": msg.content}
+                        for msg in self.conversation_history
                     ]
 
-                # Check if pruning is needed
-                if self.context_manager.should_prune(messages_dict):
+                    # Convert memories to dict format; the context window
+                    # returns the ones that fit as Memory objects
+                    memories_dict = None
+                    if retrieved_memories:
+                        memories_dict = [mem.model_dump() for mem in retrieved_memories]
+
                     context_window = self.context_manager.prepare_context(
                         messages_dict,
                         memories=memories_dict
@@ -120,65 +186,230 @@ class LLMAgent(Agent):
                     if context_window.pruned_count > 0:
                         print(f"[{self.id}] Pruned {context_window.pruned_count} messages "
                               f"to fit context window ({context_window.total_tokens} tokens)")
-                elif memories_dict:
+                elif retrieved_memories:
                     # Add memories without pruning
-                    # Insert memories after system messages
-                    system_count = sum(1 for msg in messages_to_send if msg.role == "system")
+                    # Insert memories after system messages, reusing the
+                    # send buffer rather than concatenating slices
                     memory_messages = [
-                        LLMMessage(role=mem["role"], content=mem["content"])
-                        for mem in memories_dict
+                        LLMMessage(role="system", content=f"[Memory] {mem.content}")
+                        for mem in retrieved_memories
                     ]
-                    messages_to_send = (
-                        messages_to_send[:system_count] +
-                        memory_messages +
-                        messages_to_send[system_count:]
-                    )
+                    messages_to_send = self._send_buffer
+                    messages_to_send[:] = self.conversation_history
+                    messages_to_send[self._system_count:self._system_count] = memory_messages
 
-            # Generate response using LLM
-            response = await self.llm_provider.generate(
-                messages=messages_to_send,
-                temperature=0.7,
-                max_tokens=1024
-            )
+            # Generate response using LLM, within the shared concurrency
+            # limit and timeout when they are set
+            if self.stream_responses:
+                generation = self._stream_response(messages_to_send, message)
+            else:
+                generation = self._generate_response(messages_to_send)
+
+            async with self.llm_semaphore or nullcontext():
+                if self.llm_timeout is None:
+                    content, model, usage = await generation
+                else:
+                    content, model, usage = await asyncio.wait_for(
+                        generation, self.llm_timeout
+                    )
 
             # Add assistant response to history
-            assistant_message = LLMMessage(role="assistant", content=response.content)
-            self.conversation_history.append(assistant_message)
+            assistant_message = LLMMessage(role="assistant", content=content)
+            self._append_history(assistant_message)
 
             # Persist assistant response to memory if enabled
-            if self.memory_manager and self.session_id:
-                await self.memory_manager.store_conversation_entry(
-                    agent_id=self.id,
-                    session_id=self.session_id,
-                    role="assistant",
-                    content=response.content,
-                    importance_score=0.5,
-                )
+            if self._persist_active:
+                await self._persist_conversation_entry("assistant", content)
 
             # Send response back
+            metadata = {
+                "model": model,
+                "usage": usage,
+                "in_reply_to": message.id
+            }
+            if self.stream_responses:
+                metadata["streaming"] = True
+                metadata["stream_event"] = "end"
+
             response_message = Message(
                 type=MessageType.RESPONSE,
                 sender=self.id,
                 recipient=message.sender,
-                content=response.content,
-                metadata={
-                    "model": response.model,
-                    "usage": response.usage,
-                    "in_reply_to": message.id
-                }
+                content=content,
+                metadata=metadata
             )
 
             await self.send_message(response_message)
 
         except Exception as e:
-            error_message = Message(
-                type=MessageType.ERROR,
+            error_message = Message.error(
+                self.id, e, "Error generating response",
+                recipient=message.sender, in_reply_to=message.id,
+            )
+            await self.send_message(error_message)
+
+    async def _generate_response(
+        self, messages: list[LLMMessage]
+    ) -> tuple[str, str, Optional[dict]]:
+        """
+        Generate the full LLM response in one call.
+
+        Returns:
+            Tuple of (content, model, usage)
+        """
+        response = await self.llm_provider.generate(
+            messages=messages,
+            temperature=0.7,
+            max_tokens=1024
+        )
+        return response.content, response.model, response.usage
+
+    async def _stream_response(
+        self, messages: list[LLMMessage], message: Message
+    ) -> tuple[str, str, Optional[dict]]:
+        """
+        Stream the LLM response to the sender as it is generated.
+
+        Sends a RESPONSE with metadata stream_event="start" and empty content
+        straight away, then one stream_event="delta" RESPONSE per text chunk.
+        The caller sends the final stream_event="end" RESPONSE carrying the
+        full text, which is also the only thing kept in history.
+
+        Returns:
+            Tuple of (full content, model, usage)
+        """
+        await self.send_message(Message(
+            type=MessageType.RESPONSE,
+            sender=self.id,
+            recipient=message.sender,
+            content="",
+            metadata={
+                "streaming": True,
+                "stream_event": "start",
+                "in_reply_to": message.id
+            }
+        ))
+
+        # Every delta of this stream carries the same metadata, so build it
+        # once and share it instead of allocating a dict per chunk
+        delta_metadata = {
+            "streaming": True,
+            "stream_event": "delta",
+            "in_reply_to": message.id
+        }
+        parts: list[str] = []
+        model = self.llm_provider.model
+        usage = None
+        async for chunk in self.llm_provider.stream(
+            messages=messages,
+            temperature=0.7,
+            max_tokens=1024
+        ):
+            model = chunk.model
+            if chunk.usage:
+                usage = chunk.usage
+            if not chunk.content:
+                continue
+
+            parts.append(chunk.content)
+            await self.send_message(Message(
+                type=MessageType.RESPONSE,
                 sender=self.id,
                 recipient=message.sender,
-                content=f"Error generating response: {str(e)}",
-                metadata={"error": str(e)}
+                content=chunk.content,
+                metadata=delta_metadata
+            ))
+
+        return "".join(parts), model, usage
+
+    async def _retrieve_memories(self, content: str) -> list:
+        """
+        Retrieve memories relevant to message content, with caching.
+
+        Identical content (ignoring case and whitespace) within the cache TTL
+        reuses the previous result instead of querying storage again.
+        """
+        normalized = " ".join(content.lower().split())
+        key = hashlib.sha1(normalized.encode("utf-8")).digest()
+        now = time.monotonic()
+
+        cached = self._retrieval_cache.get(key)
+        if cached is not None:
+            stored_at, memories = cached
+            if now - stored_at < self.retrieval_cache_ttl:
+                self._retrieval_cache.move_to_end(key)
+                return memories
+            del self._retrieval_cache[key]
+
+        memories = await self.memory_retriever.retrieve_for_message(
+            agent_id=self.id,
+            message_content=content,
+            session_id=self.session_id,
+            limit=3,
+        )
+
+        self._retrieval_cache[key] = (now, memories)
+        if len(self._retrieval_cache) > self.retrieval_cache_size:
+            self._retrieval_cache.popitem(last=False)
+
+        return memories
+
+    async def _persist_conversation_entry(self, role: str, content: str) -> None:
+        """
+        Persist a conversation entry to memory.
+
+        While the agent is running the entry is handed to the background
+        writer so storage latency stays off the response path; otherwise it
+        is stored immediately.
+        """
+        if self._persist_task is None:
+            await self.memory_manager.store_conversation_entry(
+                agent_id=self.id,
+                session_id=self.session_id,
+                role=role,
+                content=content,
+                importance_score=0.5,
             )
-            await self.send_message(error_message)
+            return
+
+        self._persist_queue.put_nowait({
+            "agent_id": self.id,
+            "session_id": self.session_id,
+            "role": role,
+            "content": content,
+            "importance_score": 0.5,
+            "timestamp": datetime.utcnow(),
+        })
+
+    async def _run_conversation_writer(self) -> None:
+        """Drain the persist queue, writing entries to memory in batches."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            entry = await self._persist_queue.get()
+            if entry is None:
+                break
+
+            batch = [entry]
+            deadline = loop.time() + self.persist_flush_interval
+            while len(batch) < self.persist_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._persist_queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            try:
+                await self.memory_manager.store_conversation_entries_bulk(batch)
+            except Exception as e:
+                print(f"[{self.id}] Warning: Failed to persist conversation: {e}")
 
     def _format_message_for_llm(self, message: Message) -> LLMMessage:
         """
@@ -186,12 +417,29 @@ class LLMAgent(Agent):
 
         Converts the agent message into a format the LLM understands.
         """
-        content = f"Message from {message.sender} ({message.type.value}): {message.content}"
+        return LLMMessage(role="user", content=message.prompt_text())
+
+    def _append_history(self, message: LLMMessage) -> None:
+        """
+        Append a message to the conversation history.
 
-        if message.metadata:
-            content += f"\nMetadata: {message.metadata}"
+        Keeps the running token estimate up to date and, when
+        max_history_messages is set, evicts the oldest non-system message.
+        """
+        self.conversation_history.append(message)
+        self._history_tokens += estimate_message_tokens(message.role, message.content)
+        if message.role == "system":
+            self._system_count += 1
 
-        return LLMMessage(role="user", content=content)
+        if (self.max_history_messages is not None and
+                len(self.conversation_history) > self.max_history_messages):
+            for idx, msg in enumerate(self.conversation_history):
+                if msg.role != "system":
+                    del self.conversation_history[idx]
+                    self._history_tokens -= estimate_message_tokens(
+                        msg.role, msg.content
+                    )
+                    break
 
     def clear_history(self, keep_system_prompt: bool = True) -> None:
         """
@@ -208,3 +456,11 @@ class LLMAgent(Agent):
             self.conversation_history = system_messages
         else:
             self.conversation_history = []
+
+        self._history_tokens = sum(
+            estimate_message_tokens(msg.role, msg.content)
+            for msg in self.conversation_history
+        )
+        self._system_count = sum(
+            1 for msg in self.conversation_history if msg.role == "system"
+        )
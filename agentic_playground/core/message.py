@@ -2,10 +2,14 @@
 Message system for agent communication.
 """
 
+import itertools
+import json
+import os
+import secrets
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import Any, Optional
 from datetime import datetime
-from pydantic import BaseModel, Field, ConfigDict
 
 
 class MessageType(str, Enum):
@@ -16,25 +20,201 @@ class MessageType(str, Enum):
     RESPONSE = "response"  # A response to a query or task
     BROADCAST = "broadcast"  # A message to all agents
     SYSTEM = "system"  # System-level message
+    STATUS = "status"  # Status update
     ERROR = "error"  # Error notification
 
 
-class Message(BaseModel):
+# Message ids are a random per-process prefix plus a counter: unique within
+# the process by the counter, and across processes (ids are persisted and
+# restored) by the prefix. A forked child draws a new prefix
+_id_prefix = secrets.token_hex(8)
+_id_counter = itertools.count()
+
+
+def _reseed_ids() -> None:
+    """Start a fresh id prefix and counter (run in forked children)."""
+    global _id_prefix, _id_counter
+    _id_prefix = secrets.token_hex(8)
+    _id_counter = itertools.count()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_ids)
+
+# One compact encoder shared by every Message.to_bytes call
+_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+# Compact JSON for message metadata in prompts: fewer tokens than dict repr
+# and stable across runs. Values JSON can't encode fall back to str()
+_PROMPT_METADATA_ENCODER = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), default=str
+)
+
+# stream_event values of the chunks routed before a streamed reply's final
+# "end" message
+_PARTIAL_STREAM_EVENTS = frozenset(("start", "delta"))
+
+
+def _make_id() -> str:
     """
-    A message passed between agents or from the orchestrator.
+    Generate a unique message ID.
+
+    Cheaper than a uuid4 per message: the random part is drawn once per
+    process (64 bits) and each message only takes the next counter value.
     """
+    return f"{_id_prefix}-{next(_id_counter):x}"
 
-    model_config = ConfigDict(
-        json_encoders={datetime: lambda v: v.isoformat()}
-    )
 
-    id: str = Field(default_factory=lambda: datetime.now().isoformat())
+@dataclass(slots=True, kw_only=True)
+class Message:
+    """
+    A message passed between agents or from the orchestrator.
+
+    Messages are created on every hop between agents, so this is a slotted
+    dataclass rather than a validated model. Use to_dict/from_dict when a
+    message needs to cross a serialization boundary.
+    """
+
     type: MessageType
     sender: str  # Agent ID or "system"
-    recipient: Optional[str] = None  # None for broadcast
     content: str
-    metadata: dict[str, Any] = Field(default_factory=dict)
-    timestamp: datetime = Field(default_factory=datetime.now)
+    recipient: Optional[str] = None  # None for broadcast
+    metadata: dict[str, Any] = field(default_factory=dict)
+    id: str = field(default_factory=_make_id)
+    timestamp: datetime = field(default_factory=datetime.now)
+    # Cached prompt_text(); one broadcast is formatted once for all recipients
+    _prompt: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        # Accept plain strings such as "task" for the message type
+        if type(self.type) is not MessageType:
+            self.type = MessageType(self.type)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the message to a JSON-compatible dictionary."""
+        return {
+            "id": self.id,
+            "type": self.type.value,
+            "sender": self.sender,
+            "recipient": self.recipient,
+            "content": self.content,
+            "metadata": self.metadata,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Message":
+        """Create a message from a dictionary produced by to_dict."""
+        kwargs: dict[str, Any] = {
+            "type": MessageType(data["type"]),
+            "sender": data["sender"],
+            "content": data["content"],
+            "recipient": data.get("recipient"),
+            "metadata": data.get("metadata") or {},
+        }
+        if data.get("id"):
+            kwargs["id"] = data["id"]
+
+        timestamp = data.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        if timestamp is not None:
+            kwargs["timestamp"] = timestamp
+
+        return cls(**kwargs)
+
+    @classmethod
+    def _trusted(
+        cls,
+        type: MessageType,
+        sender: str,
+        recipient: Optional[str],
+        content: str,
+        metadata: dict[str, Any],
+        id: str,
+        timestamp: datetime,
+    ) -> "Message":
+        """
+        Build a message from already-validated fields, skipping __init__.
+
+        For bulk rehydration (e.g. restoring a session); every field must be
+        given and type must already be a MessageType.
+        """
+        msg = object.__new__(cls)
+        msg.type = type
+        msg.sender = sender
+        msg.recipient = recipient
+        msg.content = content
+        msg.metadata = metadata
+        msg.id = id
+        msg.timestamp = timestamp
+        msg._prompt = None
+        return msg
+
+    @property
+    def is_stream_chunk(self) -> bool:
+        """
+        Whether this is a partial chunk of a streamed reply.
+
+        A streamed reply is routed as a "start" message, "delta" messages and
+        a final "end" message carrying the full text; only the last one is a
+        complete reply.
+        """
+        return self.metadata.get("stream_event") in _PARTIAL_STREAM_EVENTS
+
+    def prompt_text(self) -> str:
+        """
+        Render the message as text for an LLM prompt.
+
+        The text is built on first use and shared by every agent the message
+        is delivered to, so messages should not be modified once routed.
+        """
+        if self._prompt is None:
+            text = f"Message from {self.sender} ({self.type.value}): {self.content}"
+            if self.metadata:
+                text += "\nMetadata: " + _PROMPT_METADATA_ENCODER.encode(self.metadata)
+            self._prompt = text
+        return self._prompt
+
+    def to_bytes(self) -> bytes:
+        """Serialize the message to compact UTF-8 JSON."""
+        return _ENCODER.encode(self.to_dict()).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Message":
+        """Create a message from bytes produced by to_bytes."""
+        return cls.from_dict(json.loads(data))
+
+    @classmethod
+    def error(
+        cls,
+        sender: str,
+        error: BaseException,
+        context: str,
+        recipient: Optional[str] = None,
+        in_reply_to: Optional[str] = None,
+    ) -> "Message":
+        """
+        Create an ERROR message for an exception.
+
+        The exception text is rendered once and shared between the content
+        ("<context>: <error>") and the metadata's "error" entry. When the
+        error answers a message, its id is kept as metadata["in_reply_to"].
+        """
+        # Some exceptions (e.g. TimeoutError) have no message; name them
+        detail = str(error) or type(error).__name__
+        metadata = {"error": detail}
+        if in_reply_to is not None:
+            metadata["in_reply_to"] = in_reply_to
+        return cls(
+            type=MessageType.ERROR,
+            sender=sender,
+            recipient=recipient,
+            content=f"{context}: {detail}",
+            metadata=metadata,
+        )
 
     def __str__(self) -> str:
         recipient_str = f" -> {self.recipient}" if self.recipient else ""
@@ -3,29 +3,118 @@ Orchestrator for managing multiple agents and their communication.
 """
 
 import asyncio
-from typing import Optional, TYPE_CHECKING
-from collections import defaultdict
+import logging
+import time
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Optional, TYPE_CHECKING
+from collections import OrderedDict, defaultdict, deque
+
+from agentic_playground.memory.models import MessageType as MemMessageType
+from agentic_playground.runtime import create_eager_task
 
 from .agent import Agent
+from .llm_agent import LLMAgent
 from .message import Message, MessageType
 
 if TYPE_CHECKING:
     from agentic_playground.memory import MemoryManager
-    from agentic_playground.memory.models import MessageType as MemMessageType
+
+logger = logging.getLogger(__name__)
+
+# Message types that complete a wait_for_response call
+_REPLY_TYPES = frozenset({MessageType.RESPONSE, MessageType.ERROR})
+
+# Metadata keys agents use to name the message a reply answers
+_REPLY_TO_KEYS = ("in_reply_to", "original_message", "original_task")
+
+# How routed message types are stored, and how stored types are restored
+_MEM_TYPE_MAP: Mapping[MessageType, MemMessageType] = MappingProxyType({
+    MessageType.TASK: MemMessageType.AGENT,
+    MessageType.RESPONSE: MemMessageType.AGENT,
+    MessageType.BROADCAST: MemMessageType.BROADCAST,
+    MessageType.ERROR: MemMessageType.SYSTEM,
+    MessageType.STATUS: MemMessageType.SYSTEM,
+})
+_CORE_TYPE_MAP: Mapping[MemMessageType, MessageType] = MappingProxyType({
+    MemMessageType.AGENT: MessageType.RESPONSE,
+    MemMessageType.USER: MessageType.TASK,
+    MemMessageType.SYSTEM: MessageType.STATUS,
+    MemMessageType.BROADCAST: MessageType.BROADCAST,
+})
 
 
 class Orchestrator:
     """
     Manages a collection of agents and routes messages between them.
+
+    Can be used as an async context manager, which starts the agents on
+    entry and always stops them on exit, including on error or cancellation.
     """
 
-    def __init__(self):
+    # While running, routed messages are persisted in the background in
+    # batches of up to persist_batch_size, collected for persist_flush_interval
+    persist_batch_size: int = 128
+    persist_flush_interval: float = 0.005
+
+    # Messages with metadata["dedupe"] set are dropped if an identical one
+    # (same sender, recipient, type and content) was routed this recently
+    dedupe_window: float = 1.0
+
+    # restore_session yields to the event loop after this many messages so
+    # running agents aren't stalled while a long session is rebuilt (0 or
+    # less never yields)
+    restore_yield_every: int = 512
+
+    def __init__(
+        self,
+        max_history: Optional[int] = None,
+        llm_concurrency: Optional[int] = 16,
+        llm_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            max_history: Most recent messages kept in message_history
+                (None keeps everything). Older messages remain available
+                from the memory manager when one is attached.
+            llm_concurrency: Most LLM calls registered LLM agents may have
+                in flight at once, e.g. after a broadcast (None for no limit)
+            llm_timeout: Seconds before a registered LLM agent's generation
+                is abandoned with an error (None for no timeout)
+        """
         self.agents: dict[str, Agent] = {}
+        # Bulkhead shared by registered LLM agents so a broadcast doesn't
+        # start an unbounded number of provider calls at once
+        self._llm_semaphore = (
+            asyncio.Semaphore(llm_concurrency) if llm_concurrency else None
+        )
+        self.llm_timeout = llm_timeout
+        self.max_history = max_history
         self.message_history: list[Message] = []
+        # Secondary indexes over message_history, maintained on append.
+        # _by_agent holds each message under its sender and its recipient
+        self._by_agent: defaultdict[str, deque[Message]] = defaultdict(deque)
+        self._by_type: defaultdict[MessageType, deque[Message]] = defaultdict(deque)
+        # Length and last message of message_history when the indexes were
+        # last updated, to notice when callers change the list directly
+        self._indexed_len = 0
+        self._indexed_last: Optional[Message] = None
         self.running = False
-        self._agent_tasks: list[asyncio.Task] = []
+        self._agent_tasks: set[asyncio.Task] = set()
         self.memory_manager: Optional["MemoryManager"] = None
         self.session_id: Optional[str] = None
+        # Whether routed messages are persisted; refreshed whenever the
+        # memory manager or session changes
+        self._persist_active = False
+        # Background writer for routed messages (runs while started)
+        self._write_queue: asyncio.Queue[Optional[dict[str, Any]]] = asyncio.Queue()
+        self._writer_task: Optional[asyncio.Task] = None
+        # (sender, recipient, type, content) -> when it was last routed
+        self._recent_dedupe: OrderedDict[tuple, float] = OrderedDict()
+        # (sender, recipient, in_reply_to, future) for each pending
+        # wait_for_response call
+        self._response_waiters: list[
+            tuple[Optional[str], Optional[str], Optional[str], asyncio.Future]
+        ] = []
 
     def register_agent(self, agent: Agent) -> None:
         """Register an agent with the orchestrator."""
@@ -35,17 +124,22 @@ class Orchestrator:
         self.agents[agent.id] = agent
         agent.set_message_callback(self._handle_message)
 
+        if isinstance(agent, LLMAgent):
+            if agent.llm_semaphore is None:
+                agent.llm_semaphore = self._llm_semaphore
+            if agent.llm_timeout is None:
+                agent.llm_timeout = self.llm_timeout
+
         # Attach memory manager if available
         if self.memory_manager and self.session_id:
             agent.set_memory_manager(self.memory_manager, self.session_id)
 
-        print(f"Registered agent: {agent}")
+        logger.info("Registered agent: %s", agent)
 
     def unregister_agent(self, agent_id: str) -> None:
         """Unregister an agent from the orchestrator."""
-        if agent_id in self.agents:
-            del self.agents[agent_id]
-            print(f"Unregistered agent: {agent_id}")
+        if self.agents.pop(agent_id, None) is not None:
+            logger.info("Unregistered agent: %s", agent_id)
 
     def attach_memory_manager(
         self,
@@ -69,6 +163,8 @@ class Orchestrator:
         else:
             self.session_id = session_id
 
+        self._persist_active = bool(self.memory_manager and self.session_id)
+
         # Attach to all registered agents
         if self.session_id:
             for agent in self.agents.values():
@@ -97,37 +193,44 @@ class Orchestrator:
             raise ValueError(f"Session {session_id} not found")
 
         self.session_id = session_id
-
-        # Restore message history
-        from agentic_playground.memory.models import MessageType as MemMessageType
-
-        stored_messages = await self.memory_manager.get_messages(session_id)
-
-        # Convert stored messages to Message objects
-        mem_to_core_type = {
-            MemMessageType.AGENT: MessageType.RESPONSE,
-            MemMessageType.USER: MessageType.TASK,
-            MemMessageType.SYSTEM: MessageType.STATUS,
-            MemMessageType.BROADCAST: MessageType.BROADCAST,
-        }
-
-        self.message_history = [
-            Message(
-                type=mem_to_core_type.get(msg.type, MessageType.RESPONSE),
-                sender=msg.sender,
-                recipient=msg.recipient,
-                content=msg.content,
-                metadata=msg.metadata,
-            )
-            for msg in stored_messages
-        ]
-
-        # Restore agent states
+        self._persist_active = True
+
+        # Restore message history, converting stored messages to Message
+        # objects as they are read rather than loading the whole session.
+        # The ids and timestamps messages were routed with (stored by
+        # _persist_message) are carried over
+        # Fields come straight from validated StoredMessages, so messages
+        # are built without going through Message.__init__
+        to_core_type = _CORE_TYPE_MAP.get
+        make_message = Message._trusted
+        yield_every = self.restore_yield_every
+        restored = 0
+        self._reset_history(())
+        async for msg in self.memory_manager.iter_messages(session_id):
+            restored += 1
+            if yield_every > 0 and restored % yield_every == 0:
+                await asyncio.sleep(0)
+            self._record_message(make_message(
+                to_core_type(msg.type, MessageType.RESPONSE),
+                msg.sender,
+                msg.recipient,
+                msg.content,
+                msg.metadata,
+                msg.id,
+                msg.timestamp,
+            ))
+
+        # Restore agent states concurrently; each is an independent read
         for agent in self.agents.values():
             agent.set_memory_manager(self.memory_manager, session_id)
-            await agent.restore_state()
+        await asyncio.gather(
+            *(agent.restore_state() for agent in self.agents.values())
+        )
 
-        print(f"Restored session {session_id} with {len(self.message_history)} messages")
+        logger.info(
+            "Restored session %s with %d messages",
+            session_id, len(self.message_history)
+        )
 
     async def save_session(self) -> None:
         """
@@ -140,17 +243,21 @@ class Orchestrator:
         if not self.memory_manager or not self.session_id:
             raise RuntimeError("No memory manager or session attached")
 
-        # Save all agent states
-        for agent in self.agents.values():
-            await agent.save_state()
+        # Make sure every routed message so far is on disk
+        await self._flush_writes()
+
+        # Save all agent states concurrently
+        await asyncio.gather(
+            *(agent.save_state() for agent in self.agents.values())
+        )
 
         # Update session metadata
         await self.memory_manager.update_session_metadata(
             self.session_id,
-            {"last_saved": asyncio.get_event_loop().time()}
+            {"last_saved": time.time()}
         )
 
-        print(f"Saved session {self.session_id}")
+        logger.info("Saved session %s", self.session_id)
 
     async def _handle_message(self, message: Message) -> None:
         """
@@ -158,48 +265,297 @@ class Orchestrator:
 
         Routes the message to the appropriate recipient(s).
         """
-        self.message_history.append(message)
-        print(f"\n{message}")
+        if message.metadata.get("dedupe") and self._is_duplicate(message):
+            logger.debug("Dropped duplicate message %s", message.id)
+            return
 
-        # Persist message if memory is enabled
-        if self.memory_manager and self.session_id:
-            from agentic_playground.memory.models import MessageType as MemMessageType
-
-            # Map MessageType to memory MessageType
-            mem_type_map = {
-                MessageType.TASK: MemMessageType.AGENT,
-                MessageType.RESPONSE: MemMessageType.AGENT,
-                MessageType.BROADCAST: MemMessageType.BROADCAST,
-                MessageType.ERROR: MemMessageType.SYSTEM,
-                MessageType.STATUS: MemMessageType.SYSTEM,
-            }
-
-            await self.memory_manager.store_message(
-                session_id=self.session_id,
-                sender=message.sender,
-                content=message.content,
-                message_type=mem_type_map.get(message.type, MemMessageType.AGENT),
-                recipient=message.recipient,
-                metadata=message.metadata,
-            )
-
-        if message.type == MessageType.BROADCAST or message.recipient is None:
-            # Broadcast to all agents except sender
-            for agent_id, agent in self.agents.items():
-                if agent_id != message.sender:
-                    await agent.receive_message(message)
-        elif message.recipient in self.agents:
-            # Direct message to specific agent
-            await self.agents[message.recipient].receive_message(message)
+        # Chunks of a streamed reply are delivered but not kept: the final
+        # "end" message carries the full text
+        if not message.is_stream_chunk:
+            self._record_message(message)
+            # Skip formatting the message entirely when INFO is not shown
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("\n%s", message)
+
+            # Persist message if memory is enabled
+            if self._persist_active:
+                await self._persist_message(message)
+
+            if self._response_waiters and message.type in _REPLY_TYPES:
+                self._resolve_waiters(message)
+
+        # Enum members are singletons, so an identity check is enough
+        if message.recipient is None or message.type is MessageType.BROADCAST:
+            # Broadcast to all agents except sender, in registration order
+            sender = message.sender
+            await self._deliver(message, (
+                agent for agent_id, agent in self.agents.items() if agent_id != sender
+            ))
+        else:
+            recipient = self.agents.get(message.recipient)
+            if recipient is not None:
+                # Direct message to specific agent
+                await self._deliver(message, (recipient,))
+            else:
+                logger.warning("Recipient %s not found", message.recipient)
+
+    async def _persist_message(self, message: Message) -> None:
+        """Store a routed message, via the background writer when running."""
+        # The message's own id and timestamp are stored, so restored history
+        # keeps the ids that reply metadata (in_reply_to etc.) refers to
+        record = {
+            "id": message.id,
+            "session_id": self.session_id,
+            "sender": message.sender,
+            "content": message.content,
+            "message_type": _MEM_TYPE_MAP.get(message.type, MemMessageType.AGENT),
+            "recipient": message.recipient,
+            "metadata": message.metadata,
+            "timestamp": message.timestamp,
+        }
+        if self._writer_task is None:
+            await self.memory_manager.store_messages_bulk([record])
         else:
-            print(f"Warning: Recipient {message.recipient} not found")
+            # Hand off to the background writer; routing doesn't wait
+            self._write_queue.put_nowait(record)
+
+    def _is_duplicate(self, message: Message) -> bool:
+        """
+        Check a dedupe-tagged message against those routed recently.
+
+        Returns True if an identical message was routed within dedupe_window,
+        otherwise remembers this one and returns False.
+        """
+        now = time.monotonic()
+        recent = self._recent_dedupe
+
+        # Entries are in routing order, so expired ones lead
+        cutoff = now - self.dedupe_window
+        while recent:
+            oldest_key, routed_at = next(iter(recent.items()))
+            if routed_at >= cutoff:
+                break
+            del recent[oldest_key]
+
+        key = (message.sender, message.recipient, message.type, message.content)
+        if key in recent:
+            return True
+        recent[key] = now
+        return False
+
+    def _resolve_waiters(self, message: Message) -> None:
+        """Complete the pending wait_for_response calls this reply matches."""
+        metadata = message.metadata
+        reply_to = next(
+            (metadata[key] for key in _REPLY_TO_KEYS if key in metadata), None
+        )
+        remaining = []
+        for waiter in self._response_waiters:
+            sender, recipient, in_reply_to, future = waiter
+            if future.done():
+                continue
+            if (
+                (sender is None or sender == message.sender)
+                and (recipient is None or recipient == message.recipient)
+                and (in_reply_to is None or in_reply_to == reply_to)
+            ):
+                future.set_result(message)
+            else:
+                remaining.append(waiter)
+        self._response_waiters = remaining
+
+    def _add_response_waiter(
+        self,
+        sender: Optional[str],
+        recipient: Optional[str] = None,
+        in_reply_to: Optional[str] = None,
+    ) -> asyncio.Future:
+        """Register a future for the next matching reply."""
+        future = asyncio.get_running_loop().create_future()
+        self._response_waiters.append((sender, recipient, in_reply_to, future))
+        return future
+
+    async def _await_waiters(
+        self, futures: list[asyncio.Future], timeout: Optional[float]
+    ) -> list[Message]:
+        """Wait for registered futures, dropping them if the wait ends early."""
+        try:
+            return await asyncio.wait_for(asyncio.gather(*futures), timeout)
+        finally:
+            for future in futures:
+                future.cancel()
+            self._response_waiters = [
+                waiter for waiter in self._response_waiters
+                if not waiter[-1].done()
+            ]
+
+    async def wait_for_response(
+        self,
+        agent_id: Optional[str] = None,
+        *,
+        recipient: Optional[str] = None,
+        in_reply_to: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Message:
+        """
+        Wait for the next response or error routed through the orchestrator.
+
+        The waiter is registered before this coroutine first suspends, so
+        awaiting it straight after sending a message cannot miss the reply.
+
+        Args:
+            agent_id: Only match replies sent by this agent (any if None)
+            recipient: Only match replies addressed to this id (any if None)
+            in_reply_to: Only match the reply to the message with this id
+                (any if None)
+            timeout: Seconds to wait before raising asyncio.TimeoutError
+
+        Returns:
+            The matching RESPONSE or ERROR message
+        """
+        future = self._add_response_waiter(agent_id, recipient, in_reply_to)
+        (message,) = await self._await_waiters([future], timeout)
+        return message
+
+    async def wait_for_all(
+        self,
+        agent_ids: Iterable[str],
+        *,
+        timeout: Optional[float] = None,
+    ) -> list[Message]:
+        """
+        Wait until each of the given agents has sent its next reply.
+
+        Args:
+            agent_ids: Agents to wait on
+            timeout: Seconds to wait for all of them before raising
+                asyncio.TimeoutError
+
+        Returns:
+            One RESPONSE or ERROR message per agent, in agent_ids order
+        """
+        futures = [self._add_response_waiter(agent_id) for agent_id in agent_ids]
+        return await self._await_waiters(futures, timeout)
+
+    async def wait_for_replies(
+        self,
+        messages: Iterable[Message],
+        *,
+        timeout: Optional[float] = None,
+    ) -> list[Message]:
+        """
+        Wait for the reply to each of the given messages.
+
+        Replies are matched by recipient and in_reply_to, so the waits can
+        overlap even when several messages went to the same agent.
+
+        Args:
+            messages: Messages already sent to agents
+            timeout: Seconds to wait for all replies before raising
+                asyncio.TimeoutError
+
+        Returns:
+            One RESPONSE or ERROR message per message, in the same order
+        """
+        futures = [
+            self._add_response_waiter(message.recipient, in_reply_to=message.id)
+            for message in messages
+        ]
+        return await self._await_waiters(futures, timeout)
+
+    @staticmethod
+    async def _deliver(message: Message, recipients: Iterable[Agent]) -> None:
+        """
+        Put a message into each recipient's inbox.
+
+        Inboxes are unbounded, so delivery normally takes the non-blocking
+        deliver() path. Agents whose class overrides receive_message are
+        handed the message through it instead, so the override still runs.
+        """
+        for agent in recipients:
+            if type(agent).receive_message is Agent.receive_message:
+                agent.deliver(message)
+            else:
+                await agent.receive_message(message)
+
+    def _record_message(self, message: Message) -> None:
+        """Append a message to the history and its indexes."""
+        self._sync_indexes()
+        history = self.message_history
+        if self.max_history is not None and len(history) >= self.max_history:
+            # Drop the oldest messages, which are also the oldest entries in
+            # each index they appear in
+            excess = len(history) - self.max_history + 1
+            for oldest in history[:excess]:
+                self._unindex_oldest(oldest)
+            del history[:excess]
+
+        history.append(message)
+        self._index_message(message)
+        self._indexed_len = len(history)
+        self._indexed_last = message
+
+    def _index_message(self, message: Message) -> None:
+        """Add a message to the per-type and per-agent indexes."""
+        self._by_type[message.type].append(message)
+        self._by_agent[message.sender].append(message)
+        if message.recipient is not None and message.recipient != message.sender:
+            self._by_agent[message.recipient].append(message)
+
+    def _sync_indexes(self) -> None:
+        """Rebuild the indexes if message_history was changed directly."""
+        history = self.message_history
+        if len(history) == self._indexed_len and (
+            not history or history[-1] is self._indexed_last
+        ):
+            return
+
+        self._by_agent.clear()
+        self._by_type.clear()
+        for message in history:
+            self._index_message(message)
+        self._indexed_len = len(history)
+        self._indexed_last = history[-1] if history else None
+
+    def _unindex_oldest(self, message: Message) -> None:
+        """Remove the oldest history message from the indexes."""
+        self._by_type[message.type].popleft()
+
+        agent_ids = [message.sender]
+        if message.recipient is not None and message.recipient != message.sender:
+            agent_ids.append(message.recipient)
+        for agent_id in agent_ids:
+            messages = self._by_agent[agent_id]
+            messages.popleft()
+            if not messages:
+                del self._by_agent[agent_id]
+
+    def _reset_history(self, messages: Iterable[Message]) -> None:
+        """Replace the history (and rebuild its indexes) with messages."""
+        self.message_history = []
+        self._by_agent.clear()
+        self._by_type.clear()
+        self._indexed_len = 0
+        self._indexed_last = None
+        for message in messages:
+            self._record_message(message)
 
     async def send_message_to_agent(self, agent_id: str, message: Message) -> None:
         """Send a message to a specific agent from the orchestrator."""
-        if agent_id in self.agents:
-            await self.agents[agent_id].receive_message(message)
-        else:
+        agent = self.agents.get(agent_id)
+        if agent is None:
             raise ValueError(f"Agent {agent_id} not found")
+        await self._deliver(message, (agent,))
+
+    async def send_messages(self, messages: Iterable[Message]) -> None:
+        """
+        Route several messages at once, as if each was sent by its sender.
+
+        Every message is delivered before any recipient runs, so independent
+        requests are processed (and their LLM calls made) concurrently.
+        """
+        for message in messages:
+            await self._handle_message(message)
 
     async def broadcast_message(self, message: Message) -> None:
         """Broadcast a message to all agents."""
@@ -209,40 +565,110 @@ class Orchestrator:
     async def start(self) -> None:
         """Start all registered agents."""
         if self.running:
-            print("Orchestrator is already running")
+            logger.warning("Orchestrator is already running")
             return
 
         self.running = True
-        print(f"\nStarting orchestrator with {len(self.agents)} agents...")
+        logger.info("\nStarting orchestrator with %d agents...", len(self.agents))
+
+        # Eager tasks run up to their first wait right away instead of
+        # each costing an extra event loop iteration
+        self._writer_task = create_eager_task(self._drain_writes())
 
         # Start all agents
         for agent in self.agents.values():
-            task = asyncio.create_task(agent.start())
-            self._agent_tasks.append(task)
-
-        print("All agents started")
+            task = create_eager_task(agent.start(), name=f"agent:{agent.id}")
+            self._agent_tasks.add(task)
+            task.add_done_callback(self._on_agent_task_done)
+
+        logger.info("All agents started")
+
+    async def _drain_writes(self) -> None:
+        """Persist queued messages in batches until the None sentinel."""
+        queue = self._write_queue
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            first = await queue.get()
+            if first is None:
+                queue.task_done()
+                break
+
+            batch = [first]
+            deadline = loop.time() + self.persist_flush_interval
+            while len(batch) < self.persist_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if record is None:
+                    queue.task_done()
+                    stopping = True
+                    break
+                batch.append(record)
+
+            try:
+                if self.memory_manager is not None:
+                    await self.memory_manager.store_messages_bulk(batch)
+            except Exception as e:
+                logger.warning("Failed to persist %d messages: %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _flush_writes(self) -> None:
+        """Wait until the background writer has stored everything queued."""
+        if self._writer_task is not None:
+            await self._write_queue.join()
+
+    def _on_agent_task_done(self, task: asyncio.Task) -> None:
+        """Forget a finished agent task and report it if it crashed."""
+        self._agent_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("%s crashed: %r", task.get_name(), task.exception())
 
     async def stop(self) -> None:
         """Stop all registered agents."""
         if not self.running:
             return
 
-        print("\nStopping orchestrator...")
+        logger.info("\nStopping orchestrator...")
         self.running = False
 
-        # Stop all agents
-        for agent in self.agents.values():
-            await agent.stop()
+        # Stop all agents concurrently (LLM agents flush pending writes on
+        # stop), without letting one failure skip the others
+        results = await asyncio.gather(
+            *(agent.stop() for agent in self.agents.values()),
+            return_exceptions=True
+        )
+        for agent, result in zip(self.agents.values(), results):
+            if isinstance(result, Exception):
+                logger.warning("Error stopping agent %s: %s", agent.id, result)
 
-        # Cancel all tasks
-        for task in self._agent_tasks:
+        # Cancel any agent loops still running and wait for them to finish
+        tasks = list(self._agent_tasks)
+        for task in tasks:
             task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Flush routed messages still waiting to be persisted
+        if self._writer_task is not None:
+            self._write_queue.put_nowait(None)
+            await self._writer_task
+            self._writer_task = None
 
-        # Wait for all tasks to complete
-        await asyncio.gather(*self._agent_tasks, return_exceptions=True)
-        self._agent_tasks.clear()
+        logger.info("All agents stopped")
 
-        print("All agents stopped")
+    async def __aenter__(self) -> "Orchestrator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.stop()
 
     def get_message_history(
         self,
@@ -251,22 +677,37 @@ class Orchestrator:
     ) -> list[Message]:
         """
         Get message history, optionally filtered by agent or message type.
-        """
-        history = self.message_history
 
-        if agent_id:
-            history = [
-                msg for msg in history
+        Filtered lookups read the per-agent/per-type indexes, so their cost
+        depends on the number of matching messages rather than the history.
+        """
+        self._sync_indexes()
+        if agent_id and message_type:
+            # Scan the shorter index and check the other criterion
+            by_agent = self._by_agent.get(agent_id, ())
+            by_type = self._by_type.get(message_type, ())
+            if len(by_agent) <= len(by_type):
+                return [msg for msg in by_agent if msg.type == message_type]
+            return [
+                msg for msg in by_type
                 if msg.sender == agent_id or msg.recipient == agent_id
             ]
 
+        if agent_id:
+            return list(self._by_agent.get(agent_id, ()))
+
         if message_type:
-            history = [msg for msg in history if msg.type == message_type]
+            return list(self._by_type.get(message_type, ()))
+
+        return list(self.message_history)
 
-        return history
+    def clear_history(self) -> None:
+        """Clear the in-memory message history (persisted messages are kept)."""
+        self._reset_history(())
 
     def print_summary(self) -> None:
         """Print a summary of the orchestrator state."""
+        self._sync_indexes()
         print("\n" + "=" * 60)
         print("ORCHESTRATOR SUMMARY")
         print("=" * 60)
@@ -275,10 +716,7 @@ class Orchestrator:
             print(f"  - {agent}")
         print(f"\nTotal Messages: {len(self.message_history)}")
 
-        msg_counts = defaultdict(int)
-        for msg in self.message_history:
-            msg_counts[msg.type] += 1
-
-        for msg_type, count in msg_counts.items():
-            print(f"  - {msg_type.value}: {count}")
+        for msg_type, messages in self._by_type.items():
+            if messages:
+                print(f"  - {msg_type.value}: {len(messages)}")
         print("=" * 60 + "\n")
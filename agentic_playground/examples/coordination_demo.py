@@ -4,13 +4,13 @@ Demonstration of agent coordination and delegation.
 This example shows how a coordinator agent can delegate tasks to worker agents.
 """
 
-import asyncio
 from dotenv import load_dotenv
 
 from agentic_playground import AgentConfig, Message, MessageType, Orchestrator
 from agentic_playground.agents import EchoAgent, CoordinatorAgent
 from agentic_playground.core import LLMAgent
 from agentic_playground.llm import AnthropicProvider
+from agentic_playground.runtime import run
 
 # Load environment variables
 load_dotenv()
@@ -62,7 +62,8 @@ async def main():
     )
     await orchestrator.send_message_to_agent("coordinator", task1)
 
-    await asyncio.sleep(2)
+    # Wait for whichever agent the task was delegated to
+    await orchestrator.wait_for_response(recipient="coordinator", timeout=30)
 
     task2 = Message(
         type=MessageType.TASK,
@@ -72,7 +73,7 @@ async def main():
     )
     await orchestrator.send_message_to_agent("coordinator", task2)
 
-    await asyncio.sleep(3)
+    await orchestrator.wait_for_response(recipient="coordinator", timeout=30)
 
     # Query coordinator status
     status_query = Message(
@@ -83,7 +84,7 @@ async def main():
     )
     await orchestrator.send_message_to_agent("coordinator", status_query)
 
-    await asyncio.sleep(2)
+    await orchestrator.wait_for_response("coordinator", timeout=30)
 
     # Stop orchestrator
     await orchestrator.stop()
@@ -93,4 +94,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -4,12 +4,12 @@ Multi-agent debate demonstration.
 This example shows multiple agents discussing a topic from different perspectives.
 """
 
-import asyncio
 from dotenv import load_dotenv
 
 from agentic_playground import AgentConfig, Message, MessageType, Orchestrator
 from agentic_playground.core import LLMAgent
 from agentic_playground.llm import AnthropicProvider
+from agentic_playground.runtime import run
 
 # Load environment variables
 load_dotenv()
@@ -67,7 +67,9 @@ async def main():
     await orchestrator.broadcast_message(topic)
 
     # Let agents respond
-    await asyncio.sleep(10)
+    await orchestrator.wait_for_all(
+        ["optimist", "pragmatist", "skeptic"], timeout=60
+    )
 
     # Follow-up question to specific agent
     followup = Message(
@@ -78,7 +80,7 @@ async def main():
     )
     await orchestrator.send_message_to_agent("skeptic", followup)
 
-    await asyncio.sleep(5)
+    await orchestrator.wait_for_response("skeptic", timeout=30)
 
     # Let pragmatist weigh in
     synthesis = Message(
@@ -89,7 +91,7 @@ async def main():
     )
     await orchestrator.send_message_to_agent("pragmatist", synthesis)
 
-    await asyncio.sleep(5)
+    await orchestrator.wait_for_response("pragmatist", timeout=30)
 
     # Stop orchestrator
     await orchestrator.stop()
@@ -99,4 +101,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -5,10 +5,10 @@ Demonstrates basic usage of the memory system with persistent storage,
 session management, and conversation history.
 """
 
-import asyncio
 from agentic_playground.core import Orchestrator, AgentConfig, LLMAgent, Message, MessageType
 from agentic_playground.llm import AnthropicProvider
 from agentic_playground.memory import MemoryManager, SQLiteStorage
+from agentic_playground.runtime import run
 
 
 async def main():
@@ -90,10 +90,9 @@ async def main():
         await orchestrator.send_message_to_agent("assistant", msg)
 
         # Wait for response
-        await asyncio.sleep(2)
-
-        # Get last response
-        recent = orchestrator.get_message_history()[-1]
+        recent = await orchestrator.wait_for_response(
+            "assistant", in_reply_to=msg.id, timeout=30
+        )
         if recent.type == MessageType.RESPONSE:
             print(f"  Assistant: {recent.content[:100]}...")
 
@@ -113,9 +112,11 @@ async def main():
     # Step 10: List all sessions
     print("\n10. Available Sessions:")
     sessions = await memory_manager.list_sessions(limit=5)
+    counts = await memory_manager.get_message_counts(
+        [sess.session_id for sess in sessions]
+    )
     for sess in sessions:
-        msg_count = await memory_manager.get_message_count(sess.session_id)
-        print(f"  - {sess.session_id[:12]}... ({msg_count} messages, "
+        print(f"  - {sess.session_id[:12]}... ({counts[sess.session_id]} messages, "
               f"created {sess.created_at.strftime('%Y-%m-%d %H:%M')})")
 
     # Clean up
@@ -132,4 +133,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -8,6 +8,7 @@ Shows how to store facts and retrieve them later based on context.
 import asyncio
 from agentic_playground.memory import MemoryManager, SQLiteStorage, MemoryType
 from agentic_playground.memory.query import QueryEngine, MemoryRetriever
+from agentic_playground.runtime import run
 
 
 async def main():
@@ -45,14 +46,18 @@ async def main():
 
     agent_id = "knowledge_agent"
 
-    for content, importance in facts:
-        await memory_manager.store_memory(
-            agent_id=agent_id,
-            session_id=session_id,
-            content=content,
-            memory_type=MemoryType.SEMANTIC,
-            importance_score=importance
-        )
+    # Store all facts in one transaction
+    await memory_manager.store_memories_bulk([
+        {
+            "agent_id": agent_id,
+            "session_id": session_id,
+            "content": content,
+            "memory_type": MemoryType.SEMANTIC,
+            "importance_score": importance,
+        }
+        for content, importance in facts
+    ])
+    for content, _ in facts:
         print(f"  ✓ Stored: {content[:50]}...")
 
     print(f"\n✓ Stored {len(facts)} semantic memories")
@@ -74,17 +79,21 @@ async def main():
         "What does the user prefer for backend?",
     ]
 
-    for query in queries:
-        print(f"\n  Query: '{query}'")
-
-        # Search for relevant memories
-        results = await query_engine.search(
+    # The searches are independent reads, so run them concurrently and
+    # print the results in the original query order
+    all_results = await asyncio.gather(*(
+        query_engine.search(
             agent_id=agent_id,
             query=query,
             memory_type=MemoryType.SEMANTIC,
             limit=2,
             min_importance=0.5
         )
+        for query in queries
+    ))
+
+    for query, results in zip(queries, all_results):
+        print(f"\n  Query: '{query}'")
 
         if results:
             print(f"  Found {len(results)} relevant memories:")
@@ -98,7 +107,7 @@ async def main():
     print("\n6. Testing keyword extraction...")
 
     test_text = "I'm working on a Python project that uses SQLite database and needs REST API endpoints"
-    keywords = await query_engine.extract_keywords(test_text, top_k=5)
+    keywords = query_engine.extract_keywords(test_text, top_k=5)
     print(f"  Text: '{test_text}'")
     print(f"  Keywords: {', '.join(keywords)}")
 
@@ -133,21 +142,15 @@ async def main():
 
     # Step 8: Show memory access statistics
     print("\n8. Memory Access Statistics:")
-    all_memories = await query_engine.search(
-        agent_id=agent_id,
-        query="*",  # Match all
-        limit=100
-    )
+    stats = await memory_manager.get_memory_stats(agent_id)
 
-    if all_memories:
-        total_accesses = sum(m.access_count for m in all_memories)
-        avg_importance = sum(m.importance_score for m in all_memories) / len(all_memories)
-        print(f"  - Total memories: {len(all_memories)}")
-        print(f"  - Total accesses: {total_accesses}")
-        print(f"  - Average importance: {avg_importance:.2f}")
+    if stats["total_memories"]:
+        print(f"  - Total memories: {stats['total_memories']}")
+        print(f"  - Total accesses: {stats['total_accesses']}")
+        print(f"  - Average importance: {stats['avg_importance']:.2f}")
 
         # Most accessed
-        most_accessed = max(all_memories, key=lambda m: m.access_count)
+        most_accessed = stats["most_accessed"]
         print(f"  - Most accessed: {most_accessed.content[:50]}... ({most_accessed.access_count} times)")
 
     # Clean up
@@ -162,4 +165,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
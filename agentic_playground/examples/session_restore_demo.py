@@ -5,10 +5,10 @@ Demonstrates how to restore a previous session from persistent storage
 and continue a conversation where it left off.
 """
 
-import asyncio
 from agentic_playground.core import Orchestrator, AgentConfig, LLMAgent, Message, MessageType
 from agentic_playground.llm import AnthropicProvider
 from agentic_playground.memory import MemoryManager, SQLiteStorage
+from agentic_playground.runtime import run
 
 
 async def main():
@@ -36,10 +36,12 @@ async def main():
         await storage.close()
         return
 
+    counts = await memory_manager.get_message_counts(
+        [sess.session_id for sess in sessions]
+    )
     for i, sess in enumerate(sessions, 1):
-        msg_count = await memory_manager.get_message_count(sess.session_id)
         print(f"  {i}. {sess.session_id[:16]}... "
-              f"({msg_count} messages, {sess.created_at.strftime('%Y-%m-%d %H:%M')})")
+              f"({counts[sess.session_id]} messages, {sess.created_at.strftime('%Y-%m-%d %H:%M')})")
 
     # Use the most recent session
     session_to_restore = sessions[0]
@@ -77,7 +79,7 @@ async def main():
 
     # Step 7: Show restored message history
     print("\n7. Restored Message History:")
-    for i, msg in enumerate(orchestrator.message_history[-5:], 1):
+    for i, msg in enumerate(orchestrator.get_message_history()[-5:], 1):
         print(f"  {i}. [{msg.type.value}] {msg.sender} → {msg.recipient or 'all'}")
         print(f"     {msg.content[:80]}...")
 
@@ -97,10 +99,9 @@ async def main():
     await orchestrator.send_message_to_agent("assistant", followup)
 
     # Wait for response
-    await asyncio.sleep(3)
-
-    # Get response
-    recent = orchestrator.get_message_history()[-1]
+    recent = await orchestrator.wait_for_response(
+        "assistant", in_reply_to=followup.id, timeout=30
+    )
     if recent.type == MessageType.RESPONSE:
         print(f"  Assistant: {recent.content[:150]}...")
 
@@ -121,4 +122,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
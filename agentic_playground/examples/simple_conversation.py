@@ -4,12 +4,12 @@ Simple conversation between two LLM-powered agents.
 This example demonstrates basic agent-to-agent communication using LLMs.
 """
 
-import asyncio
 from dotenv import load_dotenv
 
 from agentic_playground import AgentConfig, Message, MessageType, Orchestrator
 from agentic_playground.core import LLMAgent
 from agentic_playground.llm import AnthropicProvider
+from agentic_playground.runtime import run
 
 # Load environment variables
 load_dotenv()
@@ -55,22 +55,21 @@ async def main():
         recipient="alice",
         content="Tell me about a mysterious door you discovered."
     )
-    await orchestrator.send_message_to_agent("alice", initial_message)
 
-    # Let them chat for a bit
-    await asyncio.sleep(5)
-
-    # Alice responds to Bob
+    # Alice asks Bob
     message_to_bob = Message(
         type=MessageType.QUERY,
         sender="alice",
         recipient="bob",
         content="What do you think we should do about the mysterious door?"
     )
-    await alice.send_message(message_to_bob)
 
-    # Wait for conversation to unfold
-    await asyncio.sleep(5)
+    # The two exchanges are independent, so run them side by side
+    conversation = [initial_message, message_to_bob]
+    await orchestrator.send_messages(conversation)
+
+    # Wait for Alice's and Bob's replies
+    await orchestrator.wait_for_replies(conversation, timeout=30)
 
     # Stop orchestrator
     await orchestrator.stop()
@@ -80,4 +79,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -17,6 +17,7 @@ The web interface will open in your browser automatically.
 """
 
 from dotenv import load_dotenv
+from agentic_playground.runtime import install_event_loop
 from agentic_playground.webui import AgenticWebUI
 
 # Load environment variables
@@ -48,4 +49,5 @@ def main():
 
 
 if __name__ == "__main__":
+    install_event_loop()
     main()
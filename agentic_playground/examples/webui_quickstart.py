@@ -16,6 +16,7 @@ from agentic_playground import AgentConfig
 from agentic_playground.core import LLMAgent
 from agentic_playground.llm import AnthropicProvider
 from agentic_playground.agents import EchoAgent
+from agentic_playground.runtime import install_event_loop
 from agentic_playground.webui import AgenticWebUI
 
 # Load environment variables
@@ -95,4 +96,5 @@ def main():
 
 
 if __name__ == "__main__":
+    install_event_loop()
     main()
@@ -3,7 +3,7 @@ LLM integration for agents.
 """
 
 from .base import LLMProvider, LLMMessage, LLMResponse
-from .providers import AnthropicProvider, OpenAIProvider
+from .providers import close_all_clients
 
 __all__ = [
     "LLMProvider",
@@ -11,4 +11,13 @@ __all__ = [
     "LLMResponse",
     "AnthropicProvider",
     "OpenAIProvider",
+    "close_all_clients",
 ]
+
+
+def __getattr__(name):
+    """Lazy import for provider SDKs, which are slow to load."""
+    if name in ("AnthropicProvider", "OpenAIProvider"):
+        from . import providers
+        return getattr(providers, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
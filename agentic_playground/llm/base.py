@@ -2,25 +2,146 @@
 Base interface for LLM providers.
 """
 
+import asyncio
+import hashlib
+import json
 from abc import ABC, abstractmethod
-from typing import Optional, Any
-from pydantic import BaseModel
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import AsyncIterator, Awaitable, Callable, Optional, Any
 
 
-class LLMMessage(BaseModel):
-    """A message in the LLM conversation."""
+@dataclass(slots=True, frozen=True)
+class LLMMessage:
+    """
+    A message in the LLM conversation.
+
+    Whole histories are resent on every turn, so this is a frozen slotted
+    dataclass whose API dict is built once and reused by later requests.
+    """
 
     role: str  # "system", "user", "assistant"
     content: str
+    _formatted: Optional[dict[str, str]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def as_dict(self) -> dict[str, str]:
+        """Return the {"role", "content"} dict provider APIs expect."""
+        formatted = self._formatted
+        if formatted is None:
+            formatted = {"role": self.role, "content": self.content}
+            object.__setattr__(self, "_formatted", formatted)
+        return formatted
 
 
-class LLMResponse(BaseModel):
+@dataclass(slots=True)
+class LLMResponse:
     """Response from an LLM."""
 
     content: str
     model: str
     usage: Optional[dict[str, int]] = None
-    metadata: dict[str, Any] = {}
+    metadata: dict[str, Any] = field(default_factory=dict)
+
+    def copy(self) -> "LLMResponse":
+        """Return a copy whose usage and metadata can be modified freely."""
+        return replace(
+            self,
+            usage=dict(self.usage) if self.usage is not None else None,
+            metadata=dict(self.metadata),
+        )
+
+
+class ResponseCache:
+    """
+    LRU cache of LLM responses with coalescing of identical in-flight calls.
+
+    Requests are keyed by model, sampling parameters and the full message
+    list (system prompt included). A repeated request is answered from
+    memory, and concurrent identical requests share a single API call.
+
+    Args:
+        max_size: Maximum number of cached responses
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, LLMResponse] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: list[LLMMessage],
+        temperature: float,
+        max_tokens: int,
+        extra: dict[str, Any],
+    ) -> str:
+        """Build a cache key from a request's model, messages and parameters."""
+        payload = json.dumps(
+            [
+                model,
+                temperature,
+                max_tokens,
+                [(msg.role, msg.content) for msg in messages],
+                extra,
+            ],
+            ensure_ascii=False,
+            separators=(",", ":"),
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    async def get_or_create(
+        self, key: str, create: Callable[[], Awaitable[LLMResponse]]
+    ) -> LLMResponse:
+        """
+        Return the response for a key, calling create() only if needed.
+
+        Callers always get their own copy, so they may modify it freely.
+        """
+        cached = self._entries.get(key)
+        if cached is not None:
+            self._entries.move_to_end(key)
+            return cached.copy()
+
+        task = self._inflight.get(key)
+        if task is None:
+            # The call runs as its own task so no caller's cancellation or
+            # timeout can cancel it for the others waiting on the same key
+            task = asyncio.ensure_future(self._create(key, create))
+            task.add_done_callback(self._retrieve_exception)
+            self._inflight[key] = task
+        response = await asyncio.shield(task)
+        return response.copy()
+
+    async def _create(
+        self, key: str, create: Callable[[], Awaitable[LLMResponse]]
+    ) -> LLMResponse:
+        try:
+            response = await create()
+        finally:
+            del self._inflight[key]
+
+        self._entries[key] = response
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return response
+
+    @staticmethod
+    def _retrieve_exception(task: asyncio.Future) -> None:
+        # Mark a failure retrieved in case every caller has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 
 class LLMProvider(ABC):
@@ -30,9 +151,25 @@ class LLMProvider(ABC):
     Provides a unified interface for different LLM APIs.
     """
 
-    def __init__(self, model: str, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        model: str,
+        api_key: Optional[str] = None,
+        cache_size: int = 0,
+    ):
+        """
+        Args:
+            model: Model identifier
+            api_key: API key for the provider
+            cache_size: Number of responses to cache, so repeated identical
+                prompts (and concurrent duplicates) skip the API call.
+                Disabled by default since sampled responses vary per call.
+        """
         self.model = model
         self.api_key = api_key
+        self.response_cache: Optional[ResponseCache] = (
+            ResponseCache(cache_size) if cache_size > 0 else None
+        )
 
     @abstractmethod
     async def generate(
@@ -56,6 +193,53 @@ class LLMProvider(ABC):
         """
         pass
 
+    async def stream(
+        self,
+        messages: list[LLMMessage],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        **kwargs
+    ) -> AsyncIterator[LLMResponse]:
+        """
+        Stream a response from the LLM as it is generated.
+
+        Each yielded LLMResponse carries the next text delta in `content`.
+        The last one may have empty content and carries usage/metadata when
+        the provider reports them. The default implementation falls back to
+        generate() and yields the whole response as a single chunk.
+
+        Args:
+            messages: List of messages in the conversation
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens to generate
+            **kwargs: Provider-specific parameters
+
+        Yields:
+            LLMResponse chunks
+        """
+        yield await self.generate(
+            messages, temperature=temperature, max_tokens=max_tokens, **kwargs
+        )
+
+    async def _cached_generate(
+        self,
+        create: Callable[..., Awaitable[LLMResponse]],
+        messages: list[LLMMessage],
+        temperature: float,
+        max_tokens: int,
+        kwargs: dict[str, Any],
+    ) -> LLMResponse:
+        """Call create(...) for a request, through the response cache if enabled."""
+        if self.response_cache is None:
+            return await create(messages, temperature, max_tokens, **kwargs)
+
+        key = self.response_cache.make_key(
+            self.model, messages, temperature, max_tokens, kwargs
+        )
+        return await self.response_cache.get_or_create(
+            key, lambda: create(messages, temperature, max_tokens, **kwargs)
+        )
+
     def create_message(self, role: str, content: str) -> LLMMessage:
         """Helper to create an LLM message."""
         return LLMMessage(role=role, content=content)
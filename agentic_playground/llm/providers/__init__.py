@@ -2,10 +2,40 @@
 LLM provider implementations.
 """
 
-from .anthropic_provider import AnthropicProvider
-from .openai_provider import OpenAIProvider
+import importlib
+import sys
 
 __all__ = [
     "AnthropicProvider",
     "OpenAIProvider",
+    "close_all_clients",
 ]
+
+# Provider modules, each importing its SDK only when first used
+_PROVIDER_MODULES = {
+    "AnthropicProvider": "anthropic_provider",
+    "OpenAIProvider": "openai_provider",
+}
+
+
+async def close_all_clients() -> None:
+    """
+    Close the HTTP clients provider instances share on the running loop.
+
+    Call at shutdown, before the event loop the providers ran on closes;
+    runtime.run does this automatically.
+    """
+    for module_name in _PROVIDER_MODULES.values():
+        # A provider module that was never imported has no clients
+        module = sys.modules.get(f"{__name__}.{module_name}")
+        if module is not None:
+            await module.close_clients()
+
+
+def __getattr__(name):
+    """Lazy import so only the SDKs of providers in use are loaded."""
+    module_name = _PROVIDER_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    return getattr(module, name)
@@ -2,12 +2,37 @@
 Anthropic (Claude) LLM provider.
 """
 
+import asyncio
 import os
-from typing import Optional
+from typing import AsyncIterator, Optional
 from anthropic import AsyncAnthropic
 
 from ..base import LLMProvider, LLMMessage, LLMResponse
 
+# One client per (event loop, API key), shared by every provider instance so
+# they reuse a single HTTP connection pool (and its TLS sessions). The pool
+# is bound to the loop it was first used on, so each loop gets its own
+_clients: dict[tuple[asyncio.AbstractEventLoop, str], AsyncAnthropic] = {}
+
+
+def _get_client(api_key: str) -> AsyncAnthropic:
+    """Return the running loop's shared client for an API key."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get((loop, api_key))
+    if client is None:
+        # Forget clients of loops that have closed since; they can't be used
+        for key in [key for key in _clients if key[0].is_closed()]:
+            del _clients[key]
+        client = _clients[(loop, api_key)] = AsyncAnthropic(api_key=api_key)
+    return client
+
+
+async def close_clients() -> None:
+    """Close the running loop's shared clients; later calls get new ones."""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _clients if key[0] is loop]:
+        await _clients.pop(key).close()
+
 
 class AnthropicProvider(LLMProvider):
     """
@@ -17,13 +42,19 @@ class AnthropicProvider(LLMProvider):
     def __init__(
         self,
         model: str = "claude-sonnet-4-20250514",
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        cache_size: int = 0,
     ):
-        super().__init__(model, api_key or os.getenv("ANTHROPIC_API_KEY"))
+        super().__init__(
+            model, api_key or os.getenv("ANTHROPIC_API_KEY"), cache_size=cache_size
+        )
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment")
 
-        self.client = AsyncAnthropic(api_key=self.api_key)
+    @property
+    def client(self) -> AsyncAnthropic:
+        """The shared client for this provider's API key on the running loop."""
+        return _get_client(self.api_key)
 
     async def generate(
         self,
@@ -33,19 +64,20 @@ class AnthropicProvider(LLMProvider):
         **kwargs
     ) -> LLMResponse:
         """Generate a response using Claude."""
+        return await self._cached_generate(
+            self._create, messages, temperature, max_tokens, kwargs
+        )
 
-        # Extract system message if present
-        system_message = None
-        formatted_messages = []
+    async def _create(
+        self,
+        messages: list[LLMMessage],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> LLMResponse:
+        """Make the API call for generate()."""
 
-        for msg in messages:
-            if msg.role == "system":
-                system_message = msg.content
-            else:
-                formatted_messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
+        system_message, formatted_messages = self._format_messages(messages)
 
         # Make API call
         response = await self.client.messages.create(
@@ -58,10 +90,9 @@ class AnthropicProvider(LLMProvider):
         )
 
         # Extract response content
-        content = ""
-        for block in response.content:
-            if hasattr(block, "text"):
-                content += block.text
+        content = "".join(
+            block.text for block in response.content if hasattr(block, "text")
+        )
 
         return LLMResponse(
             content=content,
@@ -72,3 +103,53 @@ class AnthropicProvider(LLMProvider):
             },
             metadata={"id": response.id}
         )
+
+    async def stream(
+        self,
+        messages: list[LLMMessage],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        **kwargs
+    ) -> AsyncIterator[LLMResponse]:
+        """Stream a response from Claude, one text delta per chunk."""
+
+        system_message, formatted_messages = self._format_messages(messages)
+
+        async with self.client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            system=system_message if system_message else None,
+            messages=formatted_messages,
+            **kwargs
+        ) as stream:
+            async for text in stream.text_stream:
+                yield LLMResponse(content=text, model=self.model)
+
+            final = await stream.get_final_message()
+
+        yield LLMResponse(
+            content="",
+            model=final.model,
+            usage={
+                "input_tokens": final.usage.input_tokens,
+                "output_tokens": final.usage.output_tokens,
+            },
+            metadata={"id": final.id}
+        )
+
+    @staticmethod
+    def _format_messages(
+        messages: list[LLMMessage],
+    ) -> tuple[Optional[str], list[dict]]:
+        """Split out the system message and format the rest for the API."""
+        system_message = None
+        formatted_messages = []
+
+        for msg in messages:
+            if msg.role == "system":
+                system_message = msg.content
+            else:
+                formatted_messages.append(msg.as_dict())
+
+        return system_message, formatted_messages
@@ -2,12 +2,37 @@
 OpenAI LLM provider.
 """
 
+import asyncio
 import os
-from typing import Optional
+from typing import AsyncIterator, Optional
 from openai import AsyncOpenAI
 
 from ..base import LLMProvider, LLMMessage, LLMResponse
 
+# One client per (event loop, API key), shared by every provider instance so
+# they reuse a single HTTP connection pool (and its TLS sessions). The pool
+# is bound to the loop it was first used on, so each loop gets its own
+_clients: dict[tuple[asyncio.AbstractEventLoop, str], AsyncOpenAI] = {}
+
+
+def _get_client(api_key: str) -> AsyncOpenAI:
+    """Return the running loop's shared client for an API key."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get((loop, api_key))
+    if client is None:
+        # Forget clients of loops that have closed since; they can't be used
+        for key in [key for key in _clients if key[0].is_closed()]:
+            del _clients[key]
+        client = _clients[(loop, api_key)] = AsyncOpenAI(api_key=api_key)
+    return client
+
+
+async def close_clients() -> None:
+    """Close the running loop's shared clients; later calls get new ones."""
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _clients if key[0] is loop]:
+        await _clients.pop(key).close()
+
 
 class OpenAIProvider(LLMProvider):
     """
@@ -17,13 +42,19 @@ class OpenAIProvider(LLMProvider):
     def __init__(
         self,
         model: str = "gpt-4-turbo-preview",
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        cache_size: int = 0,
     ):
-        super().__init__(model, api_key or os.getenv("OPENAI_API_KEY"))
+        super().__init__(
+            model, api_key or os.getenv("OPENAI_API_KEY"), cache_size=cache_size
+        )
         if not self.api_key:
             raise ValueError("OPENAI_API_KEY not found in environment")
 
-        self.client = AsyncOpenAI(api_key=self.api_key)
+    @property
+    def client(self) -> AsyncOpenAI:
+        """The shared client for this provider's API key on the running loop."""
+        return _get_client(self.api_key)
 
     async def generate(
         self,
@@ -33,12 +64,21 @@ class OpenAIProvider(LLMProvider):
         **kwargs
     ) -> LLMResponse:
         """Generate a response using OpenAI."""
+        return await self._cached_generate(
+            self._create, messages, temperature, max_tokens, kwargs
+        )
+
+    async def _create(
+        self,
+        messages: list[LLMMessage],
+        temperature: float,
+        max_tokens: int,
+        **kwargs
+    ) -> LLMResponse:
+        """Make the API call for generate()."""
 
         # Format messages for OpenAI API
-        formatted_messages = [
-            {"role": msg.role, "content": msg.content}
-            for msg in messages
-        ]
+        formatted_messages = [msg.as_dict() for msg in messages]
 
         # Make API call
         response = await self.client.chat.completions.create(
@@ -66,3 +106,44 @@ class OpenAIProvider(LLMProvider):
             usage=usage,
             metadata={"id": response.id}
         )
+
+    async def stream(
+        self,
+        messages: list[LLMMessage],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        **kwargs
+    ) -> AsyncIterator[LLMResponse]:
+        """Stream a response from OpenAI, one text delta per chunk."""
+
+        formatted_messages = [msg.as_dict() for msg in messages]
+
+        stream = await self.client.chat.completions.create(
+            model=self.model,
+            messages=formatted_messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+            **kwargs
+        )
+
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield LLMResponse(
+                    content=chunk.choices[0].delta.content,
+                    model=chunk.model,
+                )
+
+            # With include_usage the final chunk has no choices, only usage
+            if chunk.usage:
+                yield LLMResponse(
+                    content="",
+                    model=chunk.model,
+                    usage={
+                        "prompt_tokens": chunk.usage.prompt_tokens,
+                        "completion_tokens": chunk.usage.completion_tokens,
+                        "total_tokens": chunk.usage.total_tokens,
+                    },
+                    metadata={"id": chunk.id}
+                )
@@ -4,16 +4,19 @@ Context window management for LLM agents.
 Handles token limits, message pruning, and context preparation.
 """
 
-from datetime import datetime
+import asyncio
 from typing import List, Dict, Optional, TYPE_CHECKING
 
 from agentic_playground.memory.utils.tokens import (
+    CONVERSATION_OVERHEAD_TOKENS,
+    MESSAGE_OVERHEAD_TOKENS,
+    estimate_message_tokens,
     estimate_tokens_for_messages,
     calculate_tokens_per_message,
 )
 from agentic_playground.memory.importance import (
     calculate_importance_score,
-    select_messages_to_prune,
+    rank_messages_by_importance,
 )
 from agentic_playground.memory.models import ConversationEntry, ContextWindow
 
@@ -21,6 +24,19 @@ if TYPE_CHECKING:
     from agentic_playground.memory.manager import MemoryManager
 
 
+def _total_tokens(message_tokens: List[int]) -> int:
+    """Total a list of per-message token counts like estimate_tokens_for_messages."""
+    if not message_tokens:
+        return 0
+    return sum(message_tokens) + CONVERSATION_OVERHEAD_TOKENS
+
+
+
+def _system_indices(messages: List[Dict[str, str]]) -> List[int]:
+    """Indices of the system messages in a message list."""
+    return [idx for idx, msg in enumerate(messages) if msg.get("role") == "system"]
+
+
 class ContextManager:
     """
     Manages context window size and message pruning for LLM agents.
@@ -66,17 +82,32 @@ class ContextManager:
         Returns:
             ContextWindow with prepared messages and metadata
         """
-        # Start with messages
-        context_messages = messages.copy()
+        # Every message sits in the protected recent window, so nothing can be
+        # pruned and there is nothing to insert
+        if not memories and len(messages) <= self.always_keep_recent:
+            return ContextWindow(
+                messages=messages,
+                total_tokens=estimate_tokens_for_messages(messages),
+                pruned_count=0,
+                retrieved_memories=[],
+            )
 
-        # Calculate current token count
-        current_tokens = estimate_tokens_for_messages(context_messages)
+        # Start with messages. No copy is needed: pruning and memory insertion
+        # build new lists, and ContextWindow validation copies what it keeps.
+        context_messages = messages
+
+        # Estimate each message and find system messages once; pruning and
+        # memory insertion reuse these
+        message_tokens = calculate_tokens_per_message(context_messages)
+        current_tokens = _total_tokens(message_tokens)
+        system_indices = _system_indices(context_messages)
 
         # Prune if needed
         pruned_count = 0
         if current_tokens > self.effective_max_tokens:
-            context_messages, pruned_count = self._prune_messages(context_messages)
-            current_tokens = estimate_tokens_for_messages(context_messages)
+            context_messages, pruned_count, current_tokens = self._prune_messages(
+                context_messages, message_tokens, system_indices
+            )
 
         # Add memories if provided and space available
         memory_objects = []
@@ -86,16 +117,20 @@ class ContextManager:
                 memories, available_tokens
             )
             if memory_messages:
-                # Insert memories after system messages but before conversation
-                system_count = sum(
-                    1 for msg in context_messages if msg.get("role") == "system"
-                )
+                # Insert memories after system messages but before conversation.
+                # Pruning only removes system messages when they are unprotected.
+                system_count = len(system_indices)
+                if pruned_count and not self.always_keep_system:
+                    system_count = len(_system_indices(context_messages))
                 context_messages = (
                     context_messages[:system_count] +
                     memory_messages +
                     context_messages[system_count:]
                 )
-                current_tokens = estimate_tokens_for_messages(context_messages)
+                current_tokens = (
+                    (current_tokens or CONVERSATION_OVERHEAD_TOKENS) +
+                    sum(calculate_tokens_per_message(memory_messages))
+                )
 
         return ContextWindow(
             messages=context_messages,
@@ -106,91 +141,72 @@ class ContextManager:
 
     def _prune_messages(
         self,
-        messages: List[Dict[str, str]]
-    ) -> tuple[List[Dict[str, str]], int]:
+        messages: List[Dict[str, str]],
+        message_tokens: Optional[List[int]] = None,
+        system_indices: Optional[List[int]] = None,
+    ) -> tuple[List[Dict[str, str]], int, int]:
         """
         Prune messages to fit within token limit.
 
         Args:
             messages: Original message list
+            message_tokens: Precomputed per-message token counts, if available
+            system_indices: Precomputed indices of system messages, if available
 
         Returns:
-            Tuple of (pruned messages, count of messages removed)
+            Tuple of (pruned messages, count of messages removed,
+            token count of the pruned messages)
         """
         if not messages:
-            return messages, 0
+            return messages, 0, 0
 
-        # Calculate how many messages we can keep
-        current_tokens = estimate_tokens_for_messages(messages)
+        # Token counts are subtracted as messages are dropped, rather than
+        # re-estimating the pruned list
+        if message_tokens is None:
+            message_tokens = calculate_tokens_per_message(messages)
+        current_tokens = _total_tokens(message_tokens)
         target_tokens = self.effective_max_tokens
 
         if current_tokens <= target_tokens:
-            return messages, 0
+            return messages, 0, current_tokens
 
-        # Binary search for the right number of messages to keep
-        # while respecting token limits
-        min_keep = self.always_keep_recent + sum(
-            1 for msg in messages if msg.get("role") == "system"
-        )
-        max_keep = len(messages)
-
-        best_keep = min_keep
-        for keep_count in range(max_keep, min_keep - 1, -1):
-            # Convert messages to format expected by importance scorer
-            scored_messages = [
-                {
-                    "content": msg.get("content", ""),
-                    "role": msg.get("role", "assistant"),
-                    "timestamp": msg.get("timestamp", datetime.utcnow()),
-                }
-                for msg in messages
-            ]
-
-            # Get indices to remove
-            to_remove_indices = select_messages_to_prune(
-                scored_messages,
-                keep_count=keep_count,
-                always_keep_recent=self.always_keep_recent,
-                always_keep_system=self.always_keep_system,
-            )
+        if system_indices is None:
+            system_indices = _system_indices(messages)
 
-            # Create pruned list
-            pruned = [
-                msg for idx, msg in enumerate(messages)
-                if idx not in to_remove_indices
-            ]
+        # Never prune below the recent window plus the system messages
+        min_keep = self.always_keep_recent + len(system_indices)
+        max_remove = max(0, len(messages) - min_keep)
 
-            # Check if it fits
-            pruned_tokens = estimate_tokens_for_messages(pruned)
-            if pruned_tokens <= target_tokens:
-                best_keep = keep_count
-                break
+        protected_indices = set(
+            range(max(0, len(messages) - self.always_keep_recent), len(messages))
+        )
+        if self.always_keep_system:
+            protected_indices.update(system_indices)
 
-        # Perform final pruning with best keep count
-        scored_messages = [
-            {
-                "content": msg.get("content", ""),
-                "role": msg.get("role", "assistant"),
-                "timestamp": msg.get("timestamp", datetime.utcnow()),
-            }
-            for msg in messages
+        # Score only the messages that may be dropped, then drop the least
+        # important until the remainder fits
+        candidates = [
+            idx for idx in range(len(messages)) if idx not in protected_indices
         ]
+        ranked = rank_messages_by_importance([messages[idx] for idx in candidates])
 
-        to_remove_indices = select_messages_to_prune(
-            scored_messages,
-            keep_count=best_keep,
-            always_keep_recent=self.always_keep_recent,
-            always_keep_system=self.always_keep_system,
-        )
+        to_remove_indices = []
+        for position, _ in reversed(ranked):
+            if current_tokens <= target_tokens or len(to_remove_indices) >= max_remove:
+                break
+            idx = candidates[position]
+            to_remove_indices.append(idx)
+            current_tokens -= message_tokens[idx]
 
+        removed = set(to_remove_indices)
         pruned_messages = [
             msg for idx, msg in enumerate(messages)
-            if idx not in to_remove_indices
+            if idx not in removed
         ]
 
         pruned_count = len(to_remove_indices)
 
-        return pruned_messages, pruned_count
+        return pruned_messages, pruned_count, current_tokens
 
     def _format_memories(
         self,
@@ -213,22 +229,23 @@ class ContextManager:
         # Format as system message
         memory_lines = ["## Relevant Context from Memory:"]
 
-        included_memories = []
-        current_tokens = estimate_tokens_for_messages([{
-            "role": "system",
-            "content": memory_lines[0]
-        }])
+        # Track the joined content length so the budget check matches what
+        # estimate_message_tokens will report for the finished message
+        # (~4 characters per token) without re-estimating it per memory
+        message_tokens = estimate_message_tokens("system", "")
+        content_chars = len(memory_lines[0])
 
+        included_memories = []
         for memory in memories:
             memory_text = f"- {memory.get('content', '')}"
-            memory_tokens = len(memory_text) // 4  # Approximate
+            next_chars = content_chars + 1 + len(memory_text)  # +1 for newline
 
-            if current_tokens + memory_tokens > available_tokens:
+            if message_tokens + next_chars // 4 > available_tokens:
                 break
 
             memory_lines.append(memory_text)
             included_memories.append(memory)
-            current_tokens += memory_tokens
+            content_chars = next_chars
 
         if len(memory_lines) == 1:
             # Only header, no memories fit
@@ -247,24 +264,44 @@ class ContextManager:
         session_id: str,
         memory_manager: "MemoryManager",
         additional_messages: Optional[List[Dict[str, str]]] = None,
+        memory_query: Optional[str] = None,
+        memory_limit: int = 5,
     ) -> ContextWindow:
         """
         Prepare context by loading from storage.
 
+        When a memory query is given, relevant memories are retrieved
+        concurrently with the conversation history and added to the context.
+
         Args:
             agent_id: Agent identifier
             session_id: Session identifier
             memory_manager: MemoryManager instance
             additional_messages: Additional messages to append
+            memory_query: Query for retrieving relevant memories (optional)
+            memory_limit: Maximum number of memories to retrieve
 
         Returns:
             ContextWindow with prepared context
         """
-        # Load conversation history from storage
-        entries = await memory_manager.get_conversation_history(
+        # Load conversation history (and memories) from storage
+        history = memory_manager.get_conversation_history(
             agent_id=agent_id,
             session_id=session_id,
         )
+        memories = None
+        if memory_query:
+            entries, retrieved = await asyncio.gather(
+                history,
+                memory_manager.retrieve_memories(
+                    agent_id=agent_id,
+                    query=memory_query,
+                    limit=memory_limit,
+                ),
+            )
+            memories = [memory.model_dump() for memory in retrieved]
+        else:
+            entries = await history
 
         # Convert to message format
         messages = [
@@ -281,7 +318,7 @@ class ContextManager:
             messages.extend(additional_messages)
 
         # Prepare context
-        return self.prepare_context(messages)
+        return self.prepare_context(messages, memories=memories)
 
     def should_prune(self, messages: List[Dict[str, str]]) -> bool:
         """
@@ -293,8 +330,28 @@ class ContextManager:
         Returns:
             True if pruning is needed
         """
-        current_tokens = estimate_tokens_for_messages(messages)
-        return current_tokens > self.effective_max_tokens
+        # Every message costs at least its formatting overhead, so a long
+        # enough list is over budget without looking at any content
+        if messages and self.is_over_budget(
+            len(messages) * MESSAGE_OVERHEAD_TOKENS + CONVERSATION_OVERHEAD_TOKENS
+        ):
+            return True
+        return self.is_over_budget(estimate_tokens_for_messages(messages))
+
+    def is_over_budget(self, token_count: int) -> bool:
+        """
+        Check if a token count exceeds the effective context budget.
+
+        Lets callers that track their own running token total skip
+        re-estimating the whole message list.
+
+        Args:
+            token_count: Total tokens of the conversation
+
+        Returns:
+            True if pruning is needed
+        """
+        return token_count > self.effective_max_tokens
 
     def get_token_usage(self, messages: List[Dict[str, str]]) -> Dict[str, int]:
         """
@@ -306,8 +363,8 @@ class ContextManager:
         Returns:
             Dictionary with token usage details
         """
-        total_tokens = estimate_tokens_for_messages(messages)
         per_message_tokens = calculate_tokens_per_message(messages)
+        total_tokens = _total_tokens(per_message_tokens)
 
         return {
             "total_tokens": total_tokens,
@@ -5,11 +5,42 @@ These algorithms determine which messages/memories should be retained
 when context pruning is needed.
 """
 
+import heapq
 import math
 import re
 from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 from typing import Dict, List, Optional
 
+# Phrases that mark content as more important; each one present adds 0.1
+_HIGH_IMPORTANCE_KEYWORDS = (
+    "error", "exception", "failed", "bug", "issue",
+    "important", "critical", "urgent",
+    "decided", "decision", "conclusion",
+    "summary", "key point", "note that",
+    "remember", "don't forget",
+)
+
+# Contents at least this long are scored without caching
+_CACHEABLE_CONTENT_LENGTH = 4096
+
+# A line starting like a list item ("- x.", "1.", ...)
+_LIST_ITEM_RE = re.compile(r'^\s*[-*\d]+\.', re.MULTILINE)
+
+# Component weights for calculate_importance_score
+_RECENCY_WEIGHT = 0.3
+_CONTENT_WEIGHT = 0.4
+_INTERACTION_WEIGHT = 0.2
+_ROLE_WEIGHT = 0.1
+
+# Role bonus; unknown roles score like "assistant"
+_ROLE_FACTORS = {
+    "user": 1.0,
+    "system": 0.9,
+    "assistant": 0.7,
+}
+
 
 def calculate_importance_score(
     content: str,
@@ -44,12 +75,6 @@ def calculate_importance_score(
     if current_time is None:
         current_time = datetime.utcnow()
 
-    # Component weights
-    RECENCY_WEIGHT = 0.3
-    CONTENT_WEIGHT = 0.4
-    INTERACTION_WEIGHT = 0.2
-    ROLE_WEIGHT = 0.1
-
     # 1. Recency factor (exponential decay)
     time_diff_hours = (current_time - timestamp).total_seconds() / 3600
     # Half-life of 24 hours
@@ -62,18 +87,15 @@ def calculate_importance_score(
     interaction_factor = 1.0 if has_replies else 0.5
 
     # 4. Role bonus
-    role_factor = {
-        "user": 1.0,
-        "system": 0.9,
-        "assistant": 0.7,
-    }.get(role.lower(), 0.7)
+    # Roles are normally already lowercase; only fold case on a miss
+    role_factor = _ROLE_FACTORS.get(role) or _ROLE_FACTORS.get(role.lower(), 0.7)
 
     # Combine factors
     score = (
-        recency_factor * RECENCY_WEIGHT +
-        content_importance * CONTENT_WEIGHT +
-        interaction_factor * INTERACTION_WEIGHT +
-        role_factor * ROLE_WEIGHT
+        recency_factor * _RECENCY_WEIGHT +
+        content_importance * _CONTENT_WEIGHT +
+        interaction_factor * _INTERACTION_WEIGHT +
+        role_factor * _ROLE_WEIGHT
     )
 
     # Clamp to [0, 1]
@@ -84,6 +106,9 @@ def _calculate_content_importance(content: str) -> float:
     """
     Calculate importance based on content characteristics.
 
+    Recurring content (system prompts, acknowledgements, tool preludes) is
+    scored once; very long contents bypass the cache to bound its memory.
+
     Args:
         content: Message content
 
@@ -92,34 +117,42 @@ def _calculate_content_importance(content: str) -> float:
     """
     if not content:
         return 0.0
+    if len(content) < _CACHEABLE_CONTENT_LENGTH:
+        return _score_content_cached(content)
+    return _score_content(content)
+
 
+def _score_content(content: str) -> float:
+    """Score non-empty content; see _calculate_content_importance."""
     score = 0.5  # Base score
+    length = len(content)
+
+    # Only the short-message penalty lowers the score, so for longer
+    # messages reaching 1.0 settles the clamped result early
+    can_settle = length >= 20
 
     content_lower = content.lower()
 
     # High importance indicators
-    high_importance_keywords = [
-        "error", "exception", "failed", "bug", "issue",
-        "important", "critical", "urgent",
-        "decided", "decision", "conclusion",
-        "summary", "key point", "note that",
-        "remember", "don't forget",
-    ]
-
-    for keyword in high_importance_keywords:
+    for keyword in _HIGH_IMPORTANCE_KEYWORDS:
         if keyword in content_lower:
             score += 0.1
+            if can_settle and score >= 1.0:
+                return 1.0
 
     # Questions are important (seeking information)
     if "?" in content:
         score += 0.15
 
-    # Code blocks are often important
-    if "```" in content or "`" in content:
+    # Code blocks and inline code are often important (a fence contains a backtick)
+    if "`" in content:
         score += 0.1
 
+    if can_settle and score >= 1.0:
+        return 1.0
+
     # Lists and structured content
-    if re.search(r'^\s*[-*\d]+\.', content, re.MULTILINE):
+    if _LIST_ITEM_RE.search(content):
         score += 0.05
 
     # URLs (references)
@@ -127,17 +160,20 @@ def _calculate_content_importance(content: str) -> float:
         score += 0.05
 
     # Long messages might contain more information
-    if len(content) > 500:
+    if length > 500:
         score += 0.05
 
     # Very short messages are less important
-    if len(content) < 20:
+    if length < 20:
         score -= 0.1
 
     # Clamp to [0, 1]
     return max(0.0, min(1.0, score))
 
 
+_score_content_cached = lru_cache(maxsize=4096)(_score_content)
+
+
 def rank_messages_by_importance(
     messages: List[Dict],
     current_time: Optional[datetime] = None,
@@ -188,6 +224,9 @@ def select_messages_to_prune(
     """
     Select which messages to prune from conversation history.
 
+    Kept as public API for callers that prune message lists themselves;
+    ContextManager ranks messages with rank_messages_by_importance instead.
+
     Strategy:
     - Always keep system messages (if enabled)
     - Always keep the most recent N messages
@@ -205,62 +244,48 @@ def select_messages_to_prune(
     if len(messages) <= keep_count:
         return []
 
-    to_remove = []
-
-    # Identify protected messages
-    protected_indices = set()
-
-    # Protect system messages
-    if always_keep_system:
-        for idx, msg in enumerate(messages):
-            if msg.get("role") == "system":
-                protected_indices.add(idx)
-
-    # Protect recent messages
+    # Split protected (system, if enabled, and recent) from unprotected
+    # messages in one pass
     recent_start = max(0, len(messages) - always_keep_recent)
-    for idx in range(recent_start, len(messages)):
-        protected_indices.add(idx)
+    unprotected_messages = []
+    for idx, msg in enumerate(messages):
+        if idx >= recent_start or (
+            always_keep_system and msg.get("role") == "system"
+        ):
+            continue
+        unprotected_messages.append((idx, msg))
 
     # Calculate available slots
-    protected_count = len(protected_indices)
+    protected_count = len(messages) - len(unprotected_messages)
     remaining_slots = keep_count - protected_count
 
     if remaining_slots <= 0:
         # Need to prune all unprotected messages
-        for idx in range(len(messages)):
-            if idx not in protected_indices:
-                to_remove.append(idx)
-        return to_remove
-
-    # Rank unprotected messages by importance
-    unprotected_messages = [
-        (idx, msg) for idx, msg in enumerate(messages)
-        if idx not in protected_indices
-    ]
+        return [idx for idx, _ in unprotected_messages]
 
     if not unprotected_messages:
         return []
 
-    # Calculate importance scores for unprotected messages
+    # Calculate importance scores for unprotected messages against one
+    # reference time
+    now = datetime.utcnow()
     scored = []
     for idx, msg in unprotected_messages:
         score = calculate_importance_score(
             content=msg.get("content", ""),
             role=msg.get("role", "assistant"),
-            timestamp=msg.get("timestamp", datetime.utcnow()),
+            timestamp=msg.get("timestamp", now),
+            current_time=now,
             has_replies=msg.get("has_replies", False),
             metadata=msg.get("metadata"),
         )
         scored.append((idx, score))
 
-    # Sort by score descending
-    scored.sort(key=lambda x: x[1], reverse=True)
-
-    # Keep top N by importance, prune the rest
-    keep_indices = {idx for idx, _ in scored[:remaining_slots]}
-
-    for idx, _ in unprotected_messages:
-        if idx not in keep_indices:
-            to_remove.append(idx)
+    # Keep top N by importance, prune the rest; nlargest matches a stable
+    # descending sort without ordering the messages that get pruned
+    keep_indices = {
+        idx for idx, _ in heapq.nlargest(remaining_slots, scored, key=itemgetter(1))
+    }
 
-    return sorted(to_remove)
+    # unprotected_messages is in index order, so this is already sorted
+    return [idx for idx, _ in unprotected_messages if idx not in keep_indices]
@@ -5,8 +5,11 @@ The MemoryManager provides a high-level interface for session management,
 message storage, agent state persistence, and memory retrieval.
 """
 
+import asyncio
+import time
+from collections import OrderedDict
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from agentic_playground.memory.storage.base import StorageBackend
 from agentic_playground.memory.models import (
@@ -49,8 +52,28 @@ class MemoryManager:
         )
     """
 
+    # Upper bounds on explicit per-call limits, so an oversized limit can't
+    # pull a whole table into model objects. A limit of None still means
+    # "all"; stream large sessions with iter_messages instead
+    max_message_limit: int = 2000
+    max_memory_limit: int = 200
+
+    # Recently read sessions are kept briefly so repeated lookups skip the
+    # database; writes made through this manager drop the affected entries
+    session_cache_size: int = 1024
+    session_cache_ttl: float = 5.0
+
     def __init__(self, storage: StorageBackend):
         self.storage = storage
+        self._session_cache: OrderedDict[str, Tuple[float, Session]] = OrderedDict()
+
+    def _forget_session(self, session_id: str) -> None:
+        """Drop a session from the lookup cache after it changes."""
+        self._session_cache.pop(session_id, None)
+
+    def _cap(self, limit: Optional[int], maximum: int) -> Optional[int]:
+        """Clamp an explicit limit to a maximum; None ("all") is kept."""
+        return None if limit is None else min(limit, maximum)
 
     # Session management
     async def create_session(
@@ -77,6 +100,7 @@ class MemoryManager:
         )
 
         await self.storage.create_session(session)
+        self._forget_session(session_id)
         return session_id
 
     async def get_session(self, session_id: str) -> Optional[Session]:
@@ -89,26 +113,48 @@ class MemoryManager:
         Returns:
             Session object if found, None otherwise
         """
-        return await self.storage.get_session(session_id)
+        cached = self._session_cache.get(session_id)
+        if cached is not None:
+            cached_at, session = cached
+            if time.monotonic() - cached_at < self.session_cache_ttl:
+                self._session_cache.move_to_end(session_id)
+                return session.model_copy(deep=True)
+            del self._session_cache[session_id]
+
+        session = await self.storage.get_session(session_id)
+        if session is None or self.session_cache_size <= 0:
+            return session
+
+        self._session_cache[session_id] = (time.monotonic(), session)
+        if len(self._session_cache) > self.session_cache_size:
+            self._session_cache.popitem(last=False)
+        # Callers get their own copy so they can't change the cached one
+        return session.model_copy(deep=True)
 
     async def list_sessions(
         self,
         limit: int = 100,
         offset: int = 0,
-        order_by: str = "last_active"
+        order_by: str = "last_active",
+        after: Optional[Session] = None,
     ) -> List[Session]:
         """
-        List all sessions.
+        List all sessions, most recent first.
+
+        To page through sessions, pass the last session of one page as
+        `after` for the next. Unlike `offset`, which still reads every
+        skipped row, this seeks straight to the next page.
 
         Args:
             limit: Maximum number of sessions to return
-            offset: Number of sessions to skip
+            offset: Number of sessions to skip (prefer `after` for paging)
             order_by: Field to order by ("created_at", "last_active")
+            after: Last session of the previous page (optional)
 
         Returns:
             List of Session objects
         """
-        return await self.storage.list_sessions(limit, offset, order_by)
+        return await self.storage.list_sessions(limit, offset, order_by, after)
 
     async def update_session_metadata(
         self,
@@ -124,6 +170,7 @@ class MemoryManager:
         """
         formatted = format_session_metadata(metadata)
         await self.storage.update_session(session_id, formatted)
+        self._forget_session(session_id)
 
     async def delete_session(self, session_id: str) -> None:
         """
@@ -133,6 +180,7 @@ class MemoryManager:
             session_id: The session identifier
         """
         await self.storage.delete_session(session_id)
+        self._forget_session(session_id)
 
     # Message operations
     async def store_message(
@@ -170,7 +218,47 @@ class MemoryManager:
             importance_score=importance_score,
         )
 
-        return await self.storage.store_message(message)
+        message_id = await self.storage.store_message(message)
+        # Storing a message bumps the session's last_active
+        self._forget_session(session_id)
+        return message_id
+
+    async def store_messages_bulk(
+        self,
+        messages: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Store several messages in a single storage call.
+
+        Args:
+            messages: Dicts with the same keys as store_message's arguments
+                (session_id, sender, content and optionally message_type,
+                recipient, metadata, importance_score) plus an optional
+                id and timestamp
+        """
+        if not messages:
+            return
+
+        stored = []
+        for msg in messages:
+            fields = {
+                "session_id": msg["session_id"],
+                "sender": msg["sender"],
+                "content": msg["content"],
+                "type": msg.get("message_type", MessageType.AGENT),
+                "recipient": msg.get("recipient"),
+                "metadata": msg.get("metadata") or {},
+                "importance_score": msg.get("importance_score", 0.5),
+            }
+            if "id" in msg:
+                fields["id"] = msg["id"]
+            if "timestamp" in msg:
+                fields["timestamp"] = msg["timestamp"]
+            stored.append(StoredMessage(**fields))
+
+        await self.storage.store_messages(stored)
+        for session_id in {message.session_id for message in stored}:
+            self._forget_session(session_id)
 
     async def get_messages(
         self,
@@ -184,14 +272,31 @@ class MemoryManager:
 
         Args:
             session_id: The session identifier
-            limit: Maximum number of messages to return
+            limit: Maximum number of messages to return (None for all,
+                otherwise at most max_message_limit; iter_messages streams
+                large sessions without loading them at once)
             offset: Number of messages to skip
             sender: Filter by sender (optional)
 
         Returns:
             List of StoredMessage objects
         """
-        return await self.storage.get_messages(session_id, limit, offset, sender)
+        return await self.storage.get_messages(
+            session_id, self._cap(limit, self.max_message_limit), offset, sender
+        )
+
+    async def iter_messages(self, session_id: str) -> AsyncIterator[StoredMessage]:
+        """
+        Iterate over a session's messages without loading them all at once.
+
+        Args:
+            session_id: The session identifier
+
+        Yields:
+            StoredMessage objects, oldest first
+        """
+        async for message in self.storage.iter_messages(session_id):
+            yield message
 
     async def get_message_count(self, session_id: str) -> int:
         """
@@ -205,6 +310,18 @@ class MemoryManager:
         """
         return await self.storage.get_message_count(session_id)
 
+    async def get_message_counts(self, session_ids: List[str]) -> Dict[str, int]:
+        """
+        Get the number of messages in each of several sessions at once.
+
+        Args:
+            session_ids: The session identifiers
+
+        Returns:
+            Message count per session id (0 for sessions without messages)
+        """
+        return await self.storage.get_message_counts(session_ids)
+
     # Conversation history operations
     async def store_conversation_entry(
         self,
@@ -237,6 +354,25 @@ class MemoryManager:
 
         return await self.storage.store_conversation_entry(entry)
 
+    async def store_conversation_entries_bulk(
+        self,
+        entries: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Store several conversation entries in a single storage call.
+
+        Args:
+            entries: Dicts with the same keys as store_conversation_entry's
+                arguments (agent_id, session_id, role, content and optionally
+                importance_score and timestamp)
+        """
+        if not entries:
+            return
+
+        await self.storage.store_conversation_entries(
+            [ConversationEntry(**entry) for entry in entries]
+        )
+
     async def get_conversation_history(
         self,
         agent_id: str,
@@ -250,14 +386,16 @@ class MemoryManager:
         Args:
             agent_id: The agent identifier
             session_id: The session identifier
-            limit: Maximum number of entries to return
+            limit: Maximum number of most recent entries to return (None
+                for all, otherwise at most max_message_limit)
             min_importance: Minimum importance score filter
 
         Returns:
             List of ConversationEntry objects
         """
         return await self.storage.get_conversation_history(
-            agent_id, session_id, limit, min_importance
+            agent_id, session_id, self._cap(limit, self.max_message_limit),
+            min_importance,
         )
 
     async def prune_conversation_history(
@@ -355,6 +493,37 @@ class MemoryManager:
 
         return await self.storage.store_memory(memory)
 
+    async def store_memories_bulk(
+        self,
+        memories: List[Dict[str, Any]],
+    ) -> List[int]:
+        """
+        Store several memories in a single storage call.
+
+        Args:
+            memories: Dicts with the same keys as store_memory's arguments
+                (agent_id, session_id, content and optionally memory_type,
+                embedding_text, importance_score, metadata)
+
+        Returns:
+            The memory IDs, in the same order
+        """
+        if not memories:
+            return []
+
+        return await self.storage.store_memories([
+            Memory(
+                agent_id=mem["agent_id"],
+                session_id=mem["session_id"],
+                memory_type=mem.get("memory_type", MemoryType.EPISODIC),
+                content=mem["content"],
+                embedding_text=mem.get("embedding_text") or mem["content"],
+                importance_score=mem.get("importance_score", 0.5),
+                metadata=mem.get("metadata") or {},
+            )
+            for mem in memories
+        ])
+
     async def retrieve_memories(
         self,
         agent_id: str,
@@ -362,6 +531,8 @@ class MemoryManager:
         memory_type: Optional[MemoryType] = None,
         limit: int = 10,
         min_importance: float = 0.0,
+        relevance_weight: float = 0.7,
+        session_id: Optional[str] = None,
     ) -> List[Memory]:
         """
         Retrieve memories matching a query.
@@ -370,23 +541,65 @@ class MemoryManager:
             agent_id: The agent identifier
             query: Search query string
             memory_type: Filter by memory type (optional)
-            limit: Maximum number of memories to return
+            limit: Maximum number of memories to return (at most
+                max_memory_limit)
             min_importance: Minimum importance score filter
+            relevance_weight: Share of the ranking from text relevance;
+                the rest comes from importance score (0.0 to 1.0)
+            session_id: Only return memories from this session (optional)
 
         Returns:
             List of Memory objects
         """
         memories = await self.storage.retrieve_memories(
-            agent_id, query, memory_type, limit, min_importance
+            agent_id, query, memory_type, self._cap(limit, self.max_memory_limit),
+            min_importance, relevance_weight, session_id,
         )
 
-        # Update access tracking for retrieved memories
-        for memory in memories:
-            if memory.id:
-                await self.storage.update_memory_access(memory.id)
+        # Update access tracking for retrieved memories in one batch
+        memory_ids = [memory.id for memory in memories if memory.id]
+        if memory_ids:
+            await self.storage.update_memory_access_many(memory_ids)
 
         return memories
 
+    async def list_memories(
+        self,
+        agent_id: str,
+        memory_type: Optional[MemoryType] = None,
+        limit: int = 100,
+    ) -> List[Memory]:
+        """
+        List an agent's memories, newest first, without searching.
+
+        Unlike retrieve_memories, this doesn't count as an access.
+
+        Args:
+            agent_id: The agent identifier
+            memory_type: Filter by memory type (optional)
+            limit: Maximum number of memories to return (at most
+                max_memory_limit)
+
+        Returns:
+            List of Memory objects
+        """
+        return await self.storage.list_memories(
+            agent_id, memory_type, self._cap(limit, self.max_memory_limit)
+        )
+
+    async def get_memory_stats(self, agent_id: str) -> Dict[str, Any]:
+        """
+        Summarize an agent's memories, computed by the storage backend.
+
+        Args:
+            agent_id: The agent identifier
+
+        Returns:
+            Dictionary with total_memories, total_accesses, avg_importance
+            and most_accessed (a Memory, or None if there are none)
+        """
+        return await self.storage.get_memory_stats(agent_id)
+
     async def delete_memories(
         self,
         agent_id: str,
@@ -412,12 +625,14 @@ class MemoryManager:
         Returns:
             Dictionary with session information
         """
-        session = await self.get_session(session_id)
+        # Independent reads; with a reader pool they run side by side
+        session, message_count = await asyncio.gather(
+            self.get_session(session_id),
+            self.get_message_count(session_id),
+        )
         if not session:
             return {}
 
-        message_count = await self.get_message_count(session_id)
-
         return {
             "session_id": session.session_id,
             "created_at": session.created_at,
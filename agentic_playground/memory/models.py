@@ -109,7 +109,7 @@ class AgentState(BaseModel):
 
 class ContextWindow(BaseModel):
     """Represents a prepared context window for LLM consumption."""
-    messages: list[Dict[str, str]]
+    messages: list[Dict[str, Any]]  # role/content, plus timestamp when loaded from storage
     total_tokens: int
     pruned_count: int = 0
     retrieved_memories: list[Memory] = Field(default_factory=list)
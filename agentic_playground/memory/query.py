@@ -4,12 +4,31 @@ Query engine for memory retrieval.
 Provides semantic search and keyword-based retrieval of memories.
 """
 
-from typing import List, Optional, TYPE_CHECKING
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import List, Optional, Tuple, TYPE_CHECKING
 from agentic_playground.memory.models import Memory, MemoryType
 
 if TYPE_CHECKING:
     from agentic_playground.memory.manager import MemoryManager
 
+# Characters that might break an FTS query; anything but a-z, 0-9,
+# whitespace and "-" (applied after lowercasing)
+_FTS_UNSAFE_RE = re.compile(r'[^a-z0-9\s\-]')
+
+_WORD_RE = re.compile(r'\b\w+\b')
+
+# Common stop words left out of extracted keywords
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
+    'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'can', 'i', 'you', 'he',
+    'she', 'it', 'we', 'they', 'what', 'which', 'who', 'when', 'where',
+    'why', 'how', 'this', 'that', 'these', 'those'
+})
+
 
 class QueryEngine:
     """
@@ -32,11 +51,14 @@ class QueryEngine:
         memory_type: Optional[MemoryType] = None,
         limit: int = 10,
         min_importance: float = 0.0,
+        hybrid_weight: float = 0.7,
+        session_id: Optional[str] = None,
     ) -> List[Memory]:
         """
         Search for memories matching a query.
 
-        Uses keyword-based search with SQLite FTS.
+        Uses keyword-based search with SQLite FTS. The best keyword matches
+        are then ranked by a blend of match relevance and importance.
 
         Args:
             agent_id: Agent identifier
@@ -44,6 +66,9 @@ class QueryEngine:
             memory_type: Optional filter by memory type
             limit: Maximum number of results
             min_importance: Minimum importance score
+            hybrid_weight: Share of the ranking from keyword relevance; the
+                rest comes from importance score (1.0 ranks by relevance only)
+            session_id: Only return memories from this session (optional)
 
         Returns:
             List of matching Memory objects
@@ -58,6 +83,8 @@ class QueryEngine:
             memory_type=memory_type,
             limit=limit,
             min_importance=min_importance,
+            relevance_weight=hybrid_weight,
+            session_id=session_id,
         )
 
         return memories
@@ -116,19 +143,14 @@ class QueryEngine:
         Returns:
             List of matching Memory objects
         """
-        # This is a simplified version - in production, you'd filter by session_id
-        # For now, we search across all sessions but limit results
-        memories = await self.search(
+        return await self.search(
             agent_id=agent_id,
             query=query,
             limit=limit,
             min_importance=0.3,  # Higher threshold for recent memories
+            session_id=session_id,
         )
 
-        # Filter by session (the storage backend should ideally do this)
-        # For MVP, we return all results
-        return memories
-
     def _preprocess_query(self, query: str) -> str:
         """
         Preprocess query for FTS search.
@@ -152,19 +174,19 @@ class QueryEngine:
 
         # Remove special characters that might break FTS
         # Keep alphanumeric, spaces, and basic punctuation
-        import re
-        query = re.sub(r'[^a-z0-9\s\-]', ' ', query)
+        query = _FTS_UNSAFE_RE.sub(' ', query)
 
         # Remove extra whitespace
         query = ' '.join(query.split())
 
         return query
 
-    async def extract_keywords(self, text: str, top_k: int = 5) -> List[str]:
+    def extract_keywords(self, text: str, top_k: int = 5) -> List[str]:
         """
         Extract keywords from text for search.
 
         Simple implementation using word frequency and common words filtering.
+        Results are cached, since the same messages are often searched again.
 
         Args:
             text: Input text
@@ -176,34 +198,26 @@ class QueryEngine:
         if not text:
             return []
 
-        # Convert to lowercase and tokenize
-        import re
-        words = re.findall(r'\b\w+\b', text.lower())
+        return list(_extract_keywords(text, top_k))
 
-        # Common stop words to filter out
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
-            'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-            'would', 'could', 'should', 'may', 'might', 'can', 'i', 'you', 'he',
-            'she', 'it', 'we', 'they', 'what', 'which', 'who', 'when', 'where',
-            'why', 'how', 'this', 'that', 'these', 'those'
-        }
 
-        # Filter stop words and short words
-        filtered_words = [
-            word for word in words
-            if word not in stop_words and len(word) > 3
-        ]
+@lru_cache(maxsize=2048)
+def _extract_keywords(text: str, top_k: int) -> Tuple[str, ...]:
+    """Extract the top_k keywords of text (pure, so safe to cache)."""
+    # Convert to lowercase and tokenize
+    words = _WORD_RE.findall(text.lower())
 
-        # Count word frequencies
-        from collections import Counter
-        word_counts = Counter(filtered_words)
+    # Filter stop words and short words
+    filtered_words = [
+        word for word in words
+        if word not in _STOP_WORDS and len(word) > 3
+    ]
 
-        # Return top k words
-        top_words = [word for word, _ in word_counts.most_common(top_k)]
+    # Count word frequencies
+    word_counts = Counter(filtered_words)
 
-        return top_words
+    # Return top k words
+    return tuple(word for word, _ in word_counts.most_common(top_k))
 
 
 class MemoryRetriever:
@@ -237,7 +251,7 @@ class MemoryRetriever:
             List of relevant Memory objects
         """
         # Extract keywords from message
-        keywords = await self.query_engine.extract_keywords(message_content, top_k=5)
+        keywords = self.query_engine.extract_keywords(message_content, top_k=5)
 
         if not keywords:
             # Fall back to full message search
@@ -4,9 +4,10 @@ Abstract base class for storage backends.
 This module defines the interface that all storage backends must implement.
 """
 
+import sys
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from agentic_playground.memory.models import (
     Session,
@@ -77,7 +78,8 @@ class StorageBackend(ABC):
         self,
         limit: int = 100,
         offset: int = 0,
-        order_by: str = "last_active"
+        order_by: str = "last_active",
+        after: Optional[Session] = None,
     ) -> List[Session]:
         """
         List all sessions.
@@ -86,6 +88,8 @@ class StorageBackend(ABC):
             limit: Maximum number of sessions to return
             offset: Number of sessions to skip
             order_by: Field to order by (e.g., "created_at", "last_active")
+            after: Last session of the previous page; listing continues
+                after it (keyset pagination, preferred over offset)
 
         Returns:
             List of Session objects
@@ -127,6 +131,19 @@ class StorageBackend(ABC):
         """
         pass
 
+    async def store_messages(self, messages: List[StoredMessage]) -> None:
+        """
+        Store several messages at once.
+
+        The default implementation stores messages one by one; backends
+        should override it to write the batch in a single transaction.
+
+        Args:
+            messages: StoredMessage objects to store, in order
+        """
+        for message in messages:
+            await self.store_message(message)
+
     @abstractmethod
     async def get_messages(
         self,
@@ -149,6 +166,22 @@ class StorageBackend(ABC):
         """
         pass
 
+    async def iter_messages(self, session_id: str) -> AsyncIterator[StoredMessage]:
+        """
+        Iterate over a session's messages in order.
+
+        The default implementation loads them with get_messages; backends
+        should override it to stream rows instead.
+
+        Args:
+            session_id: The session identifier
+
+        Yields:
+            StoredMessage objects, oldest first
+        """
+        for message in await self.get_messages(session_id):
+            yield message
+
     @abstractmethod
     async def get_message_count(self, session_id: str) -> int:
         """
@@ -162,6 +195,24 @@ class StorageBackend(ABC):
         """
         pass
 
+    async def get_message_counts(self, session_ids: List[str]) -> Dict[str, int]:
+        """
+        Get the number of messages in each of several sessions.
+
+        The default implementation counts sessions one by one; backends
+        should override it to count them in a single query.
+
+        Args:
+            session_ids: The session identifiers
+
+        Returns:
+            Message count per session id (0 for sessions without messages)
+        """
+        return {
+            session_id: await self.get_message_count(session_id)
+            for session_id in session_ids
+        }
+
     # Conversation history operations
     @abstractmethod
     async def store_conversation_entry(self, entry: ConversationEntry) -> int:
@@ -176,6 +227,22 @@ class StorageBackend(ABC):
         """
         pass
 
+    async def store_conversation_entries(
+        self,
+        entries: List[ConversationEntry]
+    ) -> None:
+        """
+        Store several conversation entries at once.
+
+        The default implementation stores entries one by one; backends
+        should override it to write the batch in a single transaction.
+
+        Args:
+            entries: ConversationEntry objects to store, in order
+        """
+        for entry in entries:
+            await self.store_conversation_entry(entry)
+
     @abstractmethod
     async def get_conversation_history(
         self,
@@ -258,6 +325,21 @@ class StorageBackend(ABC):
         """
         pass
 
+    async def store_memories(self, memories: List[Memory]) -> List[int]:
+        """
+        Store several memories at once.
+
+        The default implementation stores memories one by one; backends
+        should override it to write the batch in a single transaction.
+
+        Args:
+            memories: Memory objects to store, in order
+
+        Returns:
+            The memory IDs, in the same order
+        """
+        return [await self.store_memory(memory) for memory in memories]
+
     @abstractmethod
     async def retrieve_memories(
         self,
@@ -266,6 +348,8 @@ class StorageBackend(ABC):
         memory_type: Optional[MemoryType] = None,
         limit: int = 10,
         min_importance: float = 0.0,
+        relevance_weight: float = 0.7,
+        session_id: Optional[str] = None,
     ) -> List[Memory]:
         """
         Retrieve memories matching a query.
@@ -276,12 +360,77 @@ class StorageBackend(ABC):
             memory_type: Filter by memory type (optional)
             limit: Maximum number of memories to return
             min_importance: Minimum importance score filter
+            relevance_weight: Share of the ranking from text relevance;
+                the rest comes from importance score (0.0 to 1.0)
+            session_id: Only return memories from this session (optional)
 
         Returns:
-            List of Memory objects, ordered by relevance
+            List of Memory objects, best first
         """
         pass
 
+    async def list_memories(
+        self,
+        agent_id: str,
+        memory_type: Optional[MemoryType] = None,
+        limit: int = 100,
+    ) -> List[Memory]:
+        """
+        List an agent's memories without searching.
+
+        The default implementation passes an empty query to
+        retrieve_memories and sorts the result; backends should override
+        it with a plain listing, and must if an empty query matches nothing.
+
+        Args:
+            agent_id: The agent identifier
+            memory_type: Filter by memory type (optional)
+            limit: Maximum number of memories to return
+
+        Returns:
+            List of Memory objects, newest first
+        """
+        memories = await self.retrieve_memories(
+            agent_id, "", memory_type=memory_type, limit=limit
+        )
+        memories.sort(key=lambda memory: memory.created_at, reverse=True)
+        return memories
+
+    async def get_memory_stats(self, agent_id: str) -> Dict[str, Any]:
+        """
+        Summarize an agent's memories.
+
+        The default implementation aggregates the result of list_memories;
+        backends should override it to compute the summary in a query.
+
+        Args:
+            agent_id: The agent identifier
+
+        Returns:
+            Dictionary with total_memories, total_accesses, avg_importance
+            and most_accessed (a Memory, or None if there are none)
+        """
+        memories = await self.list_memories(agent_id, limit=sys.maxsize)
+        if not memories:
+            return {
+                "total_memories": 0,
+                "total_accesses": 0,
+                "avg_importance": 0.0,
+                "most_accessed": None,
+            }
+
+        return {
+            "total_memories": len(memories),
+            "total_accesses": sum(memory.access_count for memory in memories),
+            "avg_importance": (
+                sum(memory.importance_score for memory in memories) / len(memories)
+            ),
+            "most_accessed": max(
+                memories,
+                key=lambda memory: (memory.access_count, memory.created_at),
+            ),
+        }
+
     @abstractmethod
     async def update_memory_access(self, memory_id: int) -> None:
         """
@@ -294,6 +443,19 @@ class StorageBackend(ABC):
         """
         pass
 
+    async def update_memory_access_many(self, memory_ids: List[int]) -> None:
+        """
+        Update access tracking for several memories at once.
+
+        The default implementation updates memories one by one; backends
+        should override it to update the batch in a single statement.
+
+        Args:
+            memory_ids: The memory identifiers
+        """
+        for memory_id in memory_ids:
+            await self.update_memory_access(memory_id)
+
     @abstractmethod
     async def delete_memories(
         self,
@@ -6,9 +6,10 @@ Provides persistent storage using SQLite with async support via aiosqlite.
 
 import json
 import aiosqlite
+from contextlib import asynccontextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
 
 from agentic_playground.memory.storage.base import StorageBackend
 from agentic_playground.memory.models import (
@@ -29,13 +30,39 @@ class SQLiteStorage(StorageBackend):
     Uses aiosqlite for async database operations. Provides ACID compliance
     and zero-configuration setup.
 
+    The database runs in WAL mode, so it is accompanied by "-wal" and "-shm"
+    files next to db_path while open.
+
     Args:
         db_path: Path to the SQLite database file
+        max_readers: Extra read-only connections for queries, which WAL
+            lets run concurrently with writes (0 sends all reads through
+            the single writer connection)
     """
 
-    def __init__(self, db_path: str = "./data/sessions.db"):
+    # Applied to each connection on initialize(). WAL with synchronous=NORMAL
+    # syncs at checkpoints rather than on every commit and lets readers run
+    # alongside the writer
+    pragmas: dict[str, str] = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+        "cache_size": "-64000",  # KiB, i.e. 64 MB
+        "mmap_size": "268435456",
+        "busy_timeout": "5000",
+    }
+
+    # retrieve_memories re-scores this many of the best FTS matches
+    search_candidates: int = 50
+
+    def __init__(self, db_path: str = "./data/sessions.db", max_readers: int = 4):
         self.db_path = Path(db_path)
+        self.max_readers = max_readers
+        # All writes go through db; reads use a pooled reader connection when
+        # one is idle, so they can run alongside writes and each other
         self.db: Optional[aiosqlite.Connection] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: List[aiosqlite.Connection] = []
 
     async def initialize(self) -> None:
         """Initialize the database and create tables."""
@@ -43,14 +70,54 @@ class SQLiteStorage(StorageBackend):
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
         # Open connection
-        self.db = await aiosqlite.connect(str(self.db_path))
-        self.db.row_factory = aiosqlite.Row
+        self.db = await self._connect()
 
         # Create tables
         await self._create_tables()
 
+        # An in-memory database is private to its connection, so it can't
+        # be shared with readers
+        if str(self.db_path) != ":memory:":
+            for _ in range(self.max_readers):
+                self._readers.append(await self._connect())
+            self._idle_readers = list(self._readers)
+
+    async def _connect(self) -> aiosqlite.Connection:
+        """Open a connection to the database with the configured pragmas."""
+        conn = await aiosqlite.connect(str(self.db_path))
+        conn.row_factory = aiosqlite.Row
+
+        for name, value in self.pragmas.items():
+            async with conn.execute(f"PRAGMA {name} = {value}"):
+                pass
+
+        return conn
+
+    @asynccontextmanager
+    async def _read(
+        self, query: str, params: Iterable[Any] = ()
+    ) -> AsyncIterator[aiosqlite.Cursor]:
+        """
+        Run a read-only query on an idle reader and yield its cursor.
+
+        Falls back to the writer connection when every reader is busy, so
+        reads never wait for a reader to be returned.
+        """
+        conn = self._idle_readers.pop() if self._idle_readers else self.db
+        try:
+            async with conn.execute(query, params) as cursor:
+                yield cursor
+        finally:
+            if conn is not self.db:
+                self._idle_readers.append(conn)
+
     async def close(self) -> None:
-        """Close the database connection."""
+        """Close the database connections."""
+        for conn in self._readers:
+            await conn.close()
+        self._readers.clear()
+        self._idle_readers.clear()
+
         if self.db:
             await self.db.close()
             self.db = None
@@ -135,6 +202,17 @@ class SQLiteStorage(StorageBackend):
             ON messages(session_id, timestamp)
         """)
 
+        # Session listings are ordered (and paged) by these columns
+        await self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sessions_last_active
+            ON sessions(last_active, session_id)
+        """)
+
+        await self.db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sessions_created_at
+            ON sessions(created_at, session_id)
+        """)
+
         await self.db.execute("""
             CREATE INDEX IF NOT EXISTS idx_conv_history_agent
             ON conversation_history(agent_id, session_id, timestamp)
@@ -173,7 +251,7 @@ class SQLiteStorage(StorageBackend):
 
     async def get_session(self, session_id: str) -> Optional[Session]:
         """Retrieve a session by ID."""
-        async with self.db.execute(
+        async with self._read(
             "SELECT * FROM sessions WHERE session_id = ?",
             (session_id,),
         ) as cursor:
@@ -191,21 +269,35 @@ class SQLiteStorage(StorageBackend):
         self,
         limit: int = 100,
         offset: int = 0,
-        order_by: str = "last_active"
+        order_by: str = "last_active",
+        after: Optional[Session] = None,
     ) -> List[Session]:
-        """List all sessions."""
+        """List all sessions, seeking past `after` when paging."""
         # Validate order_by to prevent SQL injection
         valid_order_fields = {"created_at", "last_active", "session_id"}
         if order_by not in valid_order_fields:
             order_by = "last_active"
 
+        # session_id breaks ties so the (order_by, session_id) key is unique
+        # and a page can resume from the previous page's last session
+        where = ""
+        params: List[Any] = []
+        if after is not None:
+            key = getattr(after, order_by)
+            if isinstance(key, datetime):
+                key = key.isoformat()
+            where = f"WHERE ({order_by}, session_id) < (?, ?)"
+            params.extend([key, after.session_id])
+
         query = f"""
             SELECT * FROM sessions
-            ORDER BY {order_by} DESC
+            {where}
+            ORDER BY {order_by} DESC, session_id DESC
             LIMIT ? OFFSET ?
         """
+        params.extend([limit, offset])
 
-        async with self.db.execute(query, (limit, offset)) as cursor:
+        async with self._read(query, params) as cursor:
             rows = await cursor.fetchall()
             return [
                 Session(
@@ -280,6 +372,45 @@ class SQLiteStorage(StorageBackend):
 
         return message.id
 
+    async def store_messages(self, messages: List[StoredMessage]) -> None:
+        """
+        Store several messages in one transaction.
+
+        A message whose id is already stored (the same message routed again)
+        is skipped rather than failing the whole batch.
+        """
+        if not messages:
+            return
+
+        await self.db.executemany(
+            """
+            INSERT OR IGNORE INTO messages (id, session_id, timestamp, type, sender, recipient, content, metadata, importance_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    message.id,
+                    message.session_id,
+                    message.timestamp.isoformat(),
+                    message.type.value,
+                    message.sender,
+                    message.recipient,
+                    message.content,
+                    json.dumps(message.metadata),
+                    message.importance_score,
+                )
+                for message in messages
+            ],
+        )
+
+        # Update last_active once per session in the batch
+        now = datetime.utcnow().isoformat()
+        await self.db.executemany(
+            "UPDATE sessions SET last_active = ? WHERE session_id = ?",
+            [(now, session_id) for session_id in {m.session_id for m in messages}],
+        )
+        await self.db.commit()
+
     async def get_messages(
         self,
         session_id: str,
@@ -301,32 +432,70 @@ class SQLiteStorage(StorageBackend):
             query += " LIMIT ? OFFSET ?"
             params.extend([limit, offset])
 
-        async with self.db.execute(query, params) as cursor:
+        async with self._read(query, params) as cursor:
             rows = await cursor.fetchall()
-            return [
-                StoredMessage(
-                    id=row["id"],
-                    session_id=row["session_id"],
-                    timestamp=datetime.fromisoformat(row["timestamp"]),
-                    type=MessageType(row["type"]),
-                    sender=row["sender"],
-                    recipient=row["recipient"],
-                    content=row["content"],
-                    metadata=json.loads(row["metadata"]) if row["metadata"] else {},
-                    importance_score=row["importance_score"],
-                )
-                for row in rows
-            ]
+            return [self._row_to_message(row) for row in rows]
+
+    async def iter_messages(
+        self,
+        session_id: str,
+        batch_size: int = 256,
+    ) -> AsyncIterator[StoredMessage]:
+        """Yield a session's messages in order, fetching batch_size rows at a time."""
+        async with self._read(
+            "SELECT * FROM messages WHERE session_id = ? ORDER BY timestamp ASC",
+            (session_id,),
+        ) as cursor:
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._row_to_message(row)
+
+    @staticmethod
+    def _row_to_message(row: aiosqlite.Row) -> StoredMessage:
+        """Build a StoredMessage from a messages table row."""
+        return StoredMessage(
+            id=row["id"],
+            session_id=row["session_id"],
+            timestamp=datetime.fromisoformat(row["timestamp"]),
+            type=MessageType(row["type"]),
+            sender=row["sender"],
+            recipient=row["recipient"],
+            content=row["content"],
+            metadata=json.loads(row["metadata"]) if row["metadata"] else {},
+            importance_score=row["importance_score"],
+        )
 
     async def get_message_count(self, session_id: str) -> int:
         """Get the total number of messages in a session."""
-        async with self.db.execute(
+        async with self._read(
             "SELECT COUNT(*) as count FROM messages WHERE session_id = ?",
             (session_id,),
         ) as cursor:
             row = await cursor.fetchone()
             return row["count"] if row else 0
 
+    async def get_message_counts(self, session_ids: List[str]) -> Dict[str, int]:
+        """Get the number of messages in each of several sessions in one query."""
+        counts = dict.fromkeys(session_ids, 0)
+        if not counts:
+            return counts
+
+        placeholders = ", ".join("?" * len(counts))
+        async with self._read(
+            f"""
+            SELECT session_id, COUNT(*) as count FROM messages
+            WHERE session_id IN ({placeholders})
+            GROUP BY session_id
+            """,
+            list(counts),
+        ) as cursor:
+            async for row in cursor:
+                counts[row["session_id"]] = row["count"]
+        return counts
+
     # Conversation history operations
     async def store_conversation_entry(self, entry: ConversationEntry) -> int:
         """Store a conversation entry."""
@@ -349,6 +518,33 @@ class SQLiteStorage(StorageBackend):
         await self.db.commit()
         return entry_id
 
+    async def store_conversation_entries(
+        self,
+        entries: List[ConversationEntry]
+    ) -> None:
+        """Store several conversation entries in one transaction."""
+        if not entries:
+            return
+
+        await self.db.executemany(
+            """
+            INSERT INTO conversation_history (agent_id, session_id, role, content, timestamp, importance_score)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    entry.agent_id,
+                    entry.session_id,
+                    entry.role,
+                    entry.content,
+                    entry.timestamp.isoformat(),
+                    entry.importance_score,
+                )
+                for entry in entries
+            ],
+        )
+        await self.db.commit()
+
     async def get_conversation_history(
         self,
         agent_id: str,
@@ -376,7 +572,7 @@ class SQLiteStorage(StorageBackend):
             """
             params.append(limit)
 
-        async with self.db.execute(query, params) as cursor:
+        async with self._read(query, params) as cursor:
             rows = await cursor.fetchall()
             return [
                 ConversationEntry(
@@ -434,7 +630,7 @@ class SQLiteStorage(StorageBackend):
         session_id: str
     ) -> Optional[AgentState]:
         """Load agent state."""
-        async with self.db.execute(
+        async with self._read(
             "SELECT * FROM agent_states WHERE agent_id = ? AND session_id = ?",
             (agent_id, session_id),
         ) as cursor:
@@ -484,6 +680,49 @@ class SQLiteStorage(StorageBackend):
         await self.db.commit()
         return memory_id
 
+    async def store_memories(self, memories: List[Memory]) -> List[int]:
+        """Store several memories in one transaction."""
+        memory_ids = []
+        for memory in memories:
+            async with self.db.execute(
+                """
+                INSERT INTO memories (agent_id, session_id, memory_type, content, embedding_text,
+                                     importance_score, access_count, last_accessed, created_at, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    memory.agent_id,
+                    memory.session_id,
+                    memory.memory_type.value,
+                    memory.content,
+                    memory.embedding_text,
+                    memory.importance_score,
+                    memory.access_count,
+                    memory.last_accessed.isoformat() if memory.last_accessed else None,
+                    memory.created_at.isoformat(),
+                    json.dumps(memory.metadata),
+                ),
+            ) as cursor:
+                memory_ids.append(cursor.lastrowid)
+
+        if not memory_ids:
+            return memory_ids
+
+        # Index the whole batch in the FTS table at once
+        await self.db.executemany(
+            """
+            INSERT INTO memories_fts (rowid, content, embedding_text)
+            VALUES (?, ?, ?)
+            """,
+            [
+                (memory_id, memory.content, memory.embedding_text)
+                for memory_id, memory in zip(memory_ids, memories)
+            ],
+        )
+
+        await self.db.commit()
+        return memory_ids
+
     async def retrieve_memories(
         self,
         agent_id: str,
@@ -491,46 +730,125 @@ class SQLiteStorage(StorageBackend):
         memory_type: Optional[MemoryType] = None,
         limit: int = 10,
         min_importance: float = 0.0,
+        relevance_weight: float = 0.7,
+        session_id: Optional[str] = None,
     ) -> List[Memory]:
-        """Retrieve memories matching a query using FTS."""
-        # Build the query
-        base_query = """
-            SELECT m.* FROM memories m
-            JOIN memories_fts fts ON m.id = fts.rowid
-            WHERE m.agent_id = ? AND m.importance_score >= ?
         """
-        params: List[Any] = [agent_id, min_importance]
+        Retrieve memories matching a query using FTS.
+
+        The best search_candidates matches by bm25 rank are re-scored as
+        relevance_weight * relevance + (1 - relevance_weight) * importance,
+        where relevance is the bm25 rank scaled to 0..1 within the candidates.
+        """
+        # Drive the query from the FTS index, so only matching rows are
+        # looked up in memories rather than probing the index per memory
+        candidates_query = """
+            SELECT m.*, memories_fts.rank AS fts_rank FROM memories_fts
+            JOIN memories m ON m.id = memories_fts.rowid
+            WHERE memories_fts MATCH ?
+              AND m.agent_id = ? AND m.importance_score >= ?
+        """
+        params: List[Any] = [query, agent_id, min_importance]
 
         if memory_type:
-            base_query += " AND m.memory_type = ?"
+            candidates_query += " AND m.memory_type = ?"
             params.append(memory_type.value)
 
-        # Add FTS search condition
-        base_query += " AND memories_fts MATCH ?"
-        params.append(query)
+        if session_id:
+            candidates_query += " AND m.session_id = ?"
+            params.append(session_id)
+
+        # bm25 ranks are lower for better matches
+        candidates_query += " ORDER BY memories_fts.rank LIMIT ?"
+        params.append(max(limit, self.search_candidates))
 
-        # Order by relevance (FTS rank) and importance
-        base_query += " ORDER BY m.importance_score DESC, m.created_at DESC LIMIT ?"
+        base_query = f"""
+            WITH candidates AS ({candidates_query}),
+            bounds AS (
+                SELECT MIN(fts_rank) AS best, MAX(fts_rank) AS worst
+                FROM candidates
+            )
+            SELECT candidates.* FROM candidates, bounds
+            ORDER BY
+                ? * CASE WHEN worst = best THEN 1.0
+                         ELSE (worst - fts_rank) / (worst - best) END
+                + ? * importance_score DESC,
+                fts_rank, created_at DESC
+            LIMIT ?
+        """
+        params.extend([relevance_weight, 1.0 - relevance_weight, limit])
+
+        async with self._read(base_query, params) as cursor:
+            rows = await cursor.fetchall()
+            return [self._row_to_memory(row) for row in rows]
+
+    async def list_memories(
+        self,
+        agent_id: str,
+        memory_type: Optional[MemoryType] = None,
+        limit: int = 100,
+    ) -> List[Memory]:
+        """List an agent's memories, newest first, without an FTS query."""
+        query = "SELECT * FROM memories WHERE agent_id = ?"
+        params: List[Any] = [agent_id]
+
+        if memory_type:
+            query += " AND memory_type = ?"
+            params.append(memory_type.value)
+
+        query += " ORDER BY created_at DESC LIMIT ?"
         params.append(limit)
 
-        async with self.db.execute(base_query, params) as cursor:
+        async with self._read(query, params) as cursor:
             rows = await cursor.fetchall()
-            return [
-                Memory(
-                    id=row["id"],
-                    agent_id=row["agent_id"],
-                    session_id=row["session_id"],
-                    memory_type=MemoryType(row["memory_type"]),
-                    content=row["content"],
-                    embedding_text=row["embedding_text"],
-                    importance_score=row["importance_score"],
-                    access_count=row["access_count"],
-                    last_accessed=datetime.fromisoformat(row["last_accessed"]) if row["last_accessed"] else None,
-                    created_at=datetime.fromisoformat(row["created_at"]),
-                    metadata=json.loads(row["metadata"]) if row["metadata"] else {},
-                )
-                for row in rows
-            ]
+            return [self._row_to_memory(row) for row in rows]
+
+    async def get_memory_stats(self, agent_id: str) -> Dict[str, Any]:
+        """Summarize an agent's memories with aggregate queries."""
+        async with self._read(
+            """
+            SELECT COUNT(*) as count, SUM(access_count) as accesses,
+                   AVG(importance_score) as importance
+            FROM memories WHERE agent_id = ?
+            """,
+            (agent_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+
+        async with self._read(
+            """
+            SELECT * FROM memories WHERE agent_id = ?
+            ORDER BY access_count DESC, created_at DESC LIMIT 1
+            """,
+            (agent_id,),
+        ) as cursor:
+            most_accessed = await cursor.fetchone()
+
+        return {
+            "total_memories": row["count"],
+            "total_accesses": row["accesses"] or 0,
+            "avg_importance": row["importance"] or 0.0,
+            "most_accessed": (
+                self._row_to_memory(most_accessed) if most_accessed else None
+            ),
+        }
+
+    @staticmethod
+    def _row_to_memory(row: aiosqlite.Row) -> Memory:
+        """Build a Memory from a memories table row."""
+        return Memory(
+            id=row["id"],
+            agent_id=row["agent_id"],
+            session_id=row["session_id"],
+            memory_type=MemoryType(row["memory_type"]),
+            content=row["content"],
+            embedding_text=row["embedding_text"],
+            importance_score=row["importance_score"],
+            access_count=row["access_count"],
+            last_accessed=datetime.fromisoformat(row["last_accessed"]) if row["last_accessed"] else None,
+            created_at=datetime.fromisoformat(row["created_at"]),
+            metadata=json.loads(row["metadata"]) if row["metadata"] else {},
+        )
 
     async def update_memory_access(self, memory_id: int) -> None:
         """Update memory access tracking."""
@@ -544,6 +862,22 @@ class SQLiteStorage(StorageBackend):
         )
         await self.db.commit()
 
+    async def update_memory_access_many(self, memory_ids: List[int]) -> None:
+        """Update access tracking for several memories in one statement."""
+        if not memory_ids:
+            return
+
+        placeholders = ",".join("?" * len(memory_ids))
+        await self.db.execute(
+            f"""
+            UPDATE memories
+            SET access_count = access_count + 1, last_accessed = ?
+            WHERE id IN ({placeholders})
+            """,
+            [datetime.utcnow().isoformat()] + memory_ids,
+        )
+        await self.db.commit()
+
     async def delete_memories(
         self,
         agent_id: str,
@@ -8,6 +8,12 @@ tokenizers if needed.
 
 from typing import List, Dict
 
+# Per-message overhead for formatting (role, delimiters, etc.)
+MESSAGE_OVERHEAD_TOKENS = 10
+
+# Overhead for the conversation structure as a whole
+CONVERSATION_OVERHEAD_TOKENS = 5
+
 
 def estimate_tokens(text: str) -> int:
     """
@@ -30,6 +36,20 @@ def estimate_tokens(text: str) -> int:
     return max(1, char_count // 4)
 
 
+def estimate_message_tokens(role: str, content: str) -> int:
+    """
+    Estimate token count for a single message, including formatting overhead.
+
+    Args:
+        role: Message role
+        content: Message content
+
+    Returns:
+        Estimated token count
+    """
+    return estimate_tokens(role) + estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+
 def estimate_tokens_for_messages(messages: List[Dict[str, str]]) -> int:
     """
     Estimate total token count for a list of messages.
@@ -48,19 +68,11 @@ def estimate_tokens_for_messages(messages: List[Dict[str, str]]) -> int:
     total_tokens = 0
 
     for message in messages:
-        # Count tokens in role and content
-        role_tokens = estimate_tokens(message.get("role", ""))
-        content_tokens = estimate_tokens(message.get("content", ""))
-
-        # Add overhead for message formatting (~10 tokens per message)
-        message_overhead = 10
-
-        total_tokens += role_tokens + content_tokens + message_overhead
-
-    # Add overhead for conversation structure
-    conversation_overhead = 5
+        total_tokens += estimate_message_tokens(
+            message.get("role", ""), message.get("content", "")
+        )
 
-    return total_tokens + conversation_overhead
+    return total_tokens + CONVERSATION_OVERHEAD_TOKENS
 
 
 def truncate_text_to_tokens(text: str, max_tokens: int) -> str:
@@ -99,8 +111,6 @@ def calculate_tokens_per_message(messages: List[Dict[str, str]]) -> List[int]:
         List of token counts corresponding to each message
     """
     return [
-        estimate_tokens(msg.get("role", "")) +
-        estimate_tokens(msg.get("content", "")) +
-        10  # Message overhead
+        estimate_message_tokens(msg.get("role", ""), msg.get("content", ""))
         for msg in messages
     ]
@@ -0,0 +1,128 @@
+"""
+Event loop and logging setup for agent runtimes.
+
+Agents spend most of their time awaiting inbox queues and LLM HTTP calls,
+so the speed of the event loop itself matters. When uvloop is installed
+(``pip install "agentic-playground[perf]"``) it replaces the standard
+asyncio loop; otherwise the standard loop is used unchanged.
+
+The framework logs through the ``agentic_playground`` logger.
+configure_logging() sends that output to stderr from a background thread,
+so the event loop never blocks on terminal writes.
+"""
+
+import asyncio
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def install_event_loop() -> bool:
+    """
+    Install uvloop as the default event loop, if available.
+
+    Must be called before the event loop is created (i.e. before
+    ``asyncio.run`` or creating an Orchestrator inside a running loop).
+
+    Returns:
+        True if uvloop was installed, False if the default loop is kept
+    """
+    if sys.platform == "win32":
+        return False
+
+    try:
+        import uvloop
+    except ImportError:
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def create_eager_task(
+    coro: Coroutine[Any, Any, T], *, name: Optional[str] = None
+) -> "asyncio.Task[T]":
+    """
+    Create a task that starts running immediately, where supported.
+
+    On Python 3.12+ the coroutine runs synchronously up to its first real
+    suspension instead of waiting for the next loop iteration. On older
+    versions this is plain asyncio.create_task.
+
+    Args:
+        coro: Coroutine to run
+        name: Optional task name
+
+    Returns:
+        The task
+    """
+    if sys.version_info >= (3, 12):
+        return asyncio.Task(
+            coro, loop=asyncio.get_running_loop(), name=name, eager_start=True
+        )
+    return asyncio.create_task(coro, name=name)
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Show framework log output on stderr without blocking the event loop.
+
+    Records from the ``agentic_playground`` logger are put on a queue and
+    written by a listener thread. Calling this again only changes the level.
+
+    Args:
+        level: Minimum level to show (INFO shows every routed message)
+    """
+    global _listener
+
+    logger = logging.getLogger("agentic_playground")
+    logger.setLevel(level)
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.propagate = False
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    """
+    Run a coroutine on the fastest available event loop, with logging on.
+
+    Drop-in replacement for ``asyncio.run`` that also closes the LLM
+    providers' shared HTTP clients before the loop shuts down.
+
+    Args:
+        main: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    install_event_loop()
+    configure_logging()
+    return asyncio.run(_run_and_close_clients(main))
+
+
+async def _run_and_close_clients(main: Coroutine[Any, Any, T]) -> T:
+    """Await main, then close the HTTP clients providers opened on this loop."""
+    # Imported here: the providers package is only needed once a run ends
+    from agentic_playground.llm.providers import close_all_clients
+
+    try:
+        return await main
+    finally:
+        await close_all_clients()
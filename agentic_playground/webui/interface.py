@@ -696,18 +696,20 @@ class AgenticWebUI:
             sessions = loop.run_until_complete(
                 self.memory_manager.list_sessions(limit=20)
             )
+            counts = loop.run_until_complete(
+                self.memory_manager.get_message_counts(
+                    [session.session_id for session in sessions]
+                )
+            )
             loop.close()
 
             data = []
             for session in sessions:
-                msg_count_task = loop.run_until_complete(
-                    self.memory_manager.get_message_count(session.session_id)
-                )
                 data.append([
                     session.session_id[:12] + "...",
                     session.created_at.strftime("%Y-%m-%d %H:%M"),
                     session.last_active.strftime("%Y-%m-%d %H:%M"),
-                    str(msg_count_task)
+                    str(counts[session.session_id])
                 ])
 
             return data
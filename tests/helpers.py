@@ -0,0 +1,30 @@
+"""
+Shared helpers for the test suite.
+"""
+
+import asyncio
+
+from agentic_playground.llm import LLMProvider, LLMResponse
+
+
+class FakeLLMProvider(LLMProvider):
+    """LLM provider that returns a fixed reply and counts calls."""
+
+    def __init__(self, reply: str = "ok", delay: float = 0.0):
+        super().__init__(model="fake")
+        self.reply = reply
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def generate(self, messages, temperature=0.7, max_tokens=1024, **kwargs):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            return LLMResponse(content=self.reply, model=self.model)
+        finally:
+            self.active -= 1
@@ -2,9 +2,14 @@
 Basic tests for the agentic playground framework.
 """
 
+import asyncio
+
 import pytest
 from agentic_playground import AgentConfig, Message, MessageType, Orchestrator
-from agentic_playground.agents import EchoAgent
+from agentic_playground.agents import EchoAgent, CoordinatorAgent
+from agentic_playground.llm import LLMResponse
+
+from tests.helpers import FakeLLMProvider
 
 
 class TestMessage:
@@ -38,6 +43,74 @@ class TestMessage:
         assert "bob" in str_repr
         assert "task" in str_repr
 
+    def test_message_dict_round_trip(self):
+        """Test converting a message to a dict and back."""
+        msg = Message(
+            type="task",
+            sender="alice",
+            recipient="bob",
+            content="Do something",
+            metadata={"priority": 1}
+        )
+
+        restored = Message.from_dict(msg.to_dict())
+
+        assert restored == msg
+        assert restored.type is MessageType.TASK
+
+    def test_message_bytes_round_trip(self):
+        """Test that a message survives to_bytes/from_bytes."""
+        msg = Message(
+            type=MessageType.RESPONSE,
+            sender="agent1",
+            content="Grüße",
+            metadata={"in_reply_to": "abc"}
+        )
+
+        restored = Message.from_bytes(msg.to_bytes())
+
+        assert restored == msg
+
+    def test_prompt_text_is_shared_across_recipients(self):
+        """Test that a message's prompt text is rendered once and reused."""
+        msg = Message(
+            type=MessageType.BROADCAST,
+            sender="moderator",
+            content="Topic",
+            metadata={"round": 1}
+        )
+
+        text = msg.prompt_text()
+
+        assert text == 'Message from moderator (broadcast): Topic\nMetadata: {"round":1}'
+        assert msg.prompt_text() is text
+        assert "_prompt" not in repr(msg)
+
+    def test_message_ids_are_unique(self):
+        """Test that messages created back to back get distinct IDs."""
+        ids = {
+            Message(type=MessageType.QUERY, sender="alice", content="hi").id
+            for _ in range(1000)
+        }
+        assert len(ids) == 1000
+
+    def test_message_ids_differ_between_processes(self):
+        """Test that the first message id of separate processes doesn't repeat."""
+        import subprocess
+        import sys
+
+        code = (
+            "from agentic_playground import Message, MessageType;"
+            "print(Message(type=MessageType.QUERY, sender='a', content='hi').id)"
+        )
+        ids = {
+            subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True, check=True
+            ).stdout.strip()
+            for _ in range(2)
+        }
+        assert len(ids) == 2
+
 
 class TestAgentConfig:
     """Test the AgentConfig class."""
@@ -84,6 +157,153 @@ class TestOrchestrator:
         with pytest.raises(ValueError):
             orch.register_agent(agent2)
 
+    @pytest.mark.asyncio
+    async def test_message_history_filters(self):
+        """Test filtering history by agent, by type and by both."""
+        orch = Orchestrator()
+        messages = [
+            Message(type=MessageType.TASK, sender="a", recipient="b", content="1"),
+            Message(type=MessageType.RESPONSE, sender="b", recipient="a", content="2"),
+            Message(type=MessageType.TASK, sender="c", recipient="b", content="3"),
+            Message(type=MessageType.BROADCAST, sender="a", content="4"),
+        ]
+        for msg in messages:
+            await orch._handle_message(msg)
+
+        def contents(history):
+            return [m.content for m in history]
+
+        assert contents(orch.get_message_history()) == ["1", "2", "3", "4"]
+        assert contents(orch.get_message_history(agent_id="a")) == ["1", "2", "4"]
+        assert contents(orch.get_message_history(message_type=MessageType.TASK)) == ["1", "3"]
+        assert contents(orch.get_message_history(
+            agent_id="b", message_type=MessageType.TASK
+        )) == ["1", "3"]
+        assert orch.get_message_history(agent_id="nobody") == []
+
+    @pytest.mark.asyncio
+    async def test_duplicate_dedupe_messages_are_routed_once(self):
+        """Test that identical dedupe-tagged messages are only routed once."""
+        orch = Orchestrator()
+        agent = EchoAgent(name="echo1")
+        orch.register_agent(agent)
+
+        for _ in range(2):
+            await orch._handle_message(Message(
+                type=MessageType.QUERY,
+                sender="user",
+                recipient="echo1",
+                content="Same question",
+                metadata={"dedupe": True}
+            ))
+        await orch._handle_message(Message(
+            type=MessageType.QUERY, sender="user", recipient="echo1",
+            content="Same question"
+        ))
+
+        assert len(agent.inbox) == 2
+        assert len(orch.message_history) == 2
+
+    @pytest.mark.asyncio
+    async def test_bounded_history_keeps_indexes_in_step(self):
+        """Test that evicting old messages also drops them from the indexes."""
+        orch = Orchestrator(max_history=2)
+        for i, msg_type in enumerate([MessageType.TASK, MessageType.QUERY, MessageType.TASK]):
+            await orch._handle_message(Message(
+                type=msg_type, sender="a", recipient="b", content=str(i)
+            ))
+
+        assert [m.content for m in orch.get_message_history()] == ["1", "2"]
+        assert [m.content for m in orch.get_message_history(agent_id="b")] == ["1", "2"]
+        assert [m.content for m in orch.get_message_history(
+            message_type=MessageType.TASK
+        )] == ["2"]
+
+    @pytest.mark.asyncio
+    async def test_direct_history_changes_refresh_indexes(self):
+        """Test that filters stay correct when message_history is edited as a list."""
+        orch = Orchestrator(max_history=2)
+        await orch._handle_message(Message(
+            type=MessageType.TASK, sender="a", recipient="b", content="1"
+        ))
+
+        orch.message_history.clear()
+        assert orch.get_message_history(agent_id="a") == []
+
+        orch.message_history.append(Message(
+            type=MessageType.QUERY, sender="c", recipient="d", content="2"
+        ))
+        for content in ["3", "4"]:
+            await orch._handle_message(Message(
+                type=MessageType.TASK, sender="a", recipient="b", content=content
+            ))
+
+        assert [m.content for m in orch.message_history] == ["3", "4"]
+        assert [m.content for m in orch.get_message_history(agent_id="a")] == ["3", "4"]
+        assert orch.get_message_history(agent_id="c") == []
+        assert orch.get_message_history(message_type=MessageType.QUERY) == []
+
+    @pytest.mark.asyncio
+    async def test_broadcast_follows_registration_order(self):
+        """Test that broadcasts reach agents in the order they registered."""
+        orch = Orchestrator()
+        received = []
+
+        class RecordingAgent(EchoAgent):
+            async def receive_message(self, message):
+                received.append(self.id)
+
+        for name in ["zeta", "alpha", "mid", "beta"]:
+            orch.register_agent(RecordingAgent(name=name))
+
+        await orch.broadcast_message(Message(
+            type=MessageType.STATUS, sender="alpha", content="all"
+        ))
+
+        assert received == ["zeta", "mid", "beta"]
+
+    @pytest.mark.asyncio
+    async def test_receive_message_override_is_used_for_routing(self):
+        """Test that an agent overriding receive_message still gets messages through it."""
+
+        class CountingAgent(EchoAgent):
+            received = 0
+
+            async def receive_message(self, message):
+                self.received += 1
+                await super().receive_message(message)
+
+        orchestrator = Orchestrator()
+        agent = CountingAgent(name="counter")
+        orchestrator.register_agent(agent)
+
+        await orchestrator.send_message_to_agent("counter", Message(
+            type=MessageType.TASK, sender="user", content="hi"
+        ))
+        await orchestrator.broadcast_message(Message(
+            type=MessageType.STATUS, sender="user", content="all"
+        ))
+
+        assert agent.received == 2
+        assert len(agent.inbox) == 2
+
+    @pytest.mark.asyncio
+    async def test_context_manager_stops_agents_on_error(self):
+        """Test that leaving the context stops agents even when an error is raised."""
+        orchestrator = Orchestrator()
+        agent = EchoAgent(name="echo1")
+        orchestrator.register_agent(agent)
+
+        with pytest.raises(RuntimeError):
+            async with orchestrator:
+                await asyncio.sleep(0)
+                assert agent.running
+                raise RuntimeError("boom")
+
+        assert not orchestrator.running
+        assert not agent.running
+        assert not orchestrator._agent_tasks
+
 
 class TestEchoAgent:
     """Test the EchoAgent."""
@@ -124,6 +344,448 @@ class TestEchoAgent:
         # Check that a response was generated
         assert len(orch.message_history) > 0
 
+    @pytest.mark.asyncio
+    async def test_idle_agent_stops_promptly(self):
+        """Test that stopping an idle agent ends its processing loop."""
+        import asyncio
+        agent = EchoAgent(name="echo1")
+
+        task = asyncio.create_task(agent.start())
+        await asyncio.sleep(0)
+
+        await agent.stop()
+        await asyncio.wait_for(task, timeout=1.0)
+
+        assert task.done()
+        assert not agent.running
+
+
+class TestLLMAgent:
+    """Test the LLMAgent."""
+
+    @pytest.mark.asyncio
+    async def test_history_bound_keeps_system_prompt(self):
+        """Test that bounded history evicts old turns but not the system prompt."""
+        from agentic_playground.core import LLMAgent
+        from agentic_playground.memory.utils.tokens import estimate_message_tokens
+
+        config = AgentConfig(name="bot", role="Test", system_prompt="Be brief.")
+        agent = LLMAgent(config, FakeLLMProvider(), max_history_messages=3)
+
+        async def discard(message):
+            pass
+
+        agent.set_message_callback(discard)
+
+        for i in range(3):
+            await agent.process_message(Message(
+                type=MessageType.QUERY, sender="user", content=f"Question {i}"
+            ))
+
+        history = agent.conversation_history
+        assert len(history) == 3
+        assert history[0].role == "system"
+        assert agent._history_tokens == sum(
+            estimate_message_tokens(m.role, m.content) for m in history
+        )
+
+    @pytest.mark.asyncio
+    async def test_streamed_response_sends_start_deltas_and_end(self):
+        """Test that streaming emits start/delta/end and stores only the full reply."""
+        from agentic_playground.core import LLMAgent
+
+        config = AgentConfig(name="bot", role="Test")
+        agent = LLMAgent(
+            config, FakeLLMProvider(reply="hello"), stream_responses=True
+        )
+        sent = []
+
+        async def capture(message):
+            sent.append(message)
+
+        agent.set_message_callback(capture)
+        await agent.process_message(Message(
+            type=MessageType.QUERY, sender="user", content="Hi"
+        ))
+
+        events = [m.metadata["stream_event"] for m in sent]
+        assert events == ["start", "delta", "end"]
+        assert sent[0].content == ""
+        assert sent[-1].content == "hello"
+        assert agent.conversation_history[-1].content == "hello"
+
+    @pytest.mark.asyncio
+    async def test_streamed_reply_prompts_receiving_agent_once(self):
+        """Test that an LLMAgent only responds to the end of a streamed reply."""
+        from agentic_playground.core import LLMAgent
+
+        class ChunkedProvider(FakeLLMProvider):
+            async def stream(self, messages, temperature=0.7, max_tokens=1024, **kwargs):
+                for part in ("one ", "two ", "three"):
+                    yield LLMResponse(content=part, model=self.model)
+
+        orch = Orchestrator()
+        writer = LLMAgent(
+            AgentConfig(name="writer", role="Test"), ChunkedProvider(),
+            stream_responses=True,
+        )
+        reader_provider = FakeLLMProvider()
+        reader = LLMAgent(AgentConfig(name="reader", role="Test"), reader_provider)
+        orch.register_agent(writer)
+        orch.register_agent(reader)
+
+        await writer.process_message(Message(
+            type=MessageType.QUERY, sender="reader", content="Count to three"
+        ))
+        assert len(reader.inbox) == 5
+        while reader.inbox:
+            await reader.process_message(reader.inbox.popleft())
+
+        assert reader_provider.calls == 1
+        assert "one two three" in reader.conversation_history[-2].content
+        assert [m.metadata.get("stream_event") for m in orch.message_history] == [
+            "end", None
+        ]
+
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_bounds_concurrent_llm_calls(self):
+        """Test that a broadcast to LLM agents respects llm_concurrency."""
+        from agentic_playground.core import LLMAgent
+
+        provider = FakeLLMProvider(delay=0.02)
+        orch = Orchestrator(llm_concurrency=2)
+        for i in range(4):
+            orch.register_agent(LLMAgent(
+                AgentConfig(name=f"bot{i}", role="Test"), provider
+            ))
+
+        async with orch:
+            await orch.broadcast_message(Message(
+                type=MessageType.BROADCAST, sender="user", content="Hi all"
+            ))
+            await orch.wait_for_all([f"bot{i}" for i in range(4)], timeout=1)
+
+        assert provider.calls == 4
+        assert provider.max_active == 2
+
+    @pytest.mark.asyncio
+    async def test_send_messages_runs_requests_concurrently(self):
+        """Test that independent messages are processed side by side."""
+        from agentic_playground.core import LLMAgent
+
+        provider = FakeLLMProvider(delay=0.05)
+        orch = Orchestrator()
+        for name in ("alice", "bob"):
+            orch.register_agent(LLMAgent(AgentConfig(name=name, role="Test"), provider))
+
+        async with orch:
+            messages = [
+                Message(type=MessageType.QUERY, sender="system",
+                        recipient="alice", content="Hi"),
+                Message(type=MessageType.QUERY, sender="alice",
+                        recipient="bob", content="Hello"),
+            ]
+            await orch.send_messages(messages)
+            replies = await orch.wait_for_replies(messages, timeout=1)
+
+        assert [r.sender for r in replies] == ["alice", "bob"]
+        assert provider.max_active == 2
+
+    @pytest.mark.asyncio
+    async def test_wait_for_response(self):
+        """Test waiting on an agent's reply instead of sleeping."""
+        from agentic_playground.core import LLMAgent
+
+        orch = Orchestrator()
+        orch.register_agent(LLMAgent(
+            AgentConfig(name="bot", role="Test"),
+            FakeLLMProvider(reply="hello", delay=0.01),
+            stream_responses=True,
+        ))
+
+        async with orch:
+            query = Message(
+                type=MessageType.QUERY, sender="user", recipient="bot",
+                content="Hi"
+            )
+            await orch.send_message_to_agent("bot", query)
+            reply = await orch.wait_for_response(
+                "bot", in_reply_to=query.id, timeout=1
+            )
+
+            # Only the final streamed chunk completes the wait
+            assert reply.content == "hello"
+            assert reply.metadata["stream_event"] == "end"
+
+            with pytest.raises(asyncio.TimeoutError):
+                await orch.wait_for_response("bot", timeout=0.01)
+            assert orch._response_waiters == []
+
+    @pytest.mark.asyncio
+    async def test_generation_timeout_sends_error(self):
+        """Test that a generation exceeding llm_timeout is reported as an error."""
+        from agentic_playground.core import LLMAgent
+
+        agent = LLMAgent(
+            AgentConfig(name="bot", role="Test"), FakeLLMProvider(delay=1.0)
+        )
+        agent.llm_timeout = 0.01
+        sent = []
+
+        async def capture(message):
+            sent.append(message)
+
+        agent.set_message_callback(capture)
+        await agent.process_message(Message(
+            type=MessageType.QUERY, sender="user", content="Hi"
+        ))
+
+        assert [m.type for m in sent] == [MessageType.ERROR]
+
+
+class TestCoordinatorAgent:
+    """Test the CoordinatorAgent."""
+
+    @pytest.mark.asyncio
+    async def test_recurring_task_uses_cached_delegation(self):
+        """Test that a repeated task is delegated without another LLM call."""
+        provider = FakeLLMProvider(reply="echo1")
+        coordinator = CoordinatorAgent(
+            available_agents=["echo1", "echo2"], llm_provider=provider
+        )
+        sent = []
+
+        async def capture(message):
+            sent.append(message)
+
+        coordinator.set_message_callback(capture)
+
+        for content in ["Please echo this", "  please   ECHO this "]:
+            await coordinator.process_message(Message(
+                type=MessageType.TASK,
+                sender="system",
+                recipient="coordinator",
+                content=content
+            ))
+
+        assert provider.calls == 1
+        assert [m.recipient for m in sent] == ["echo1", "echo1"]
+
+    @pytest.mark.asyncio
+    async def test_response_clears_pending_task(self):
+        """Test that a delegate's response stops the task being tracked."""
+        coordinator = CoordinatorAgent(available_agents=["echo1"])
+        echo = EchoAgent(name="echo1")
+        sent = []
+
+        async def capture(message):
+            sent.append(message)
+
+        coordinator.set_message_callback(capture)
+        echo.set_message_callback(capture)
+
+        await coordinator.process_message(Message(
+            type=MessageType.TASK, sender="system", content="Do it"
+        ))
+        assert len(coordinator.pending_tasks) == 1
+
+        await echo.process_message(sent[-1])
+        await coordinator.process_message(sent[-1])
+
+        assert len(coordinator.pending_tasks) == 0
+
+    @pytest.mark.asyncio
+    async def test_tasks_within_window_are_routed_in_one_call(self):
+        """Test that tasks arriving together share a single routing LLM call."""
+        provider = FakeLLMProvider(reply="1: echo2\n2) echo1")
+        coordinator = CoordinatorAgent(
+            available_agents=["echo1", "echo2"],
+            llm_provider=provider,
+            delegation_batch_window=0.01
+        )
+        sent = []
+
+        async def capture(message):
+            sent.append(message)
+
+        coordinator.set_message_callback(capture)
+
+        for content in ["First task", "Second task"]:
+            await coordinator.process_message(Message(
+                type=MessageType.TASK,
+                sender="system",
+                recipient="coordinator",
+                content=content
+            ))
+        await coordinator.stop()
+
+        assert provider.calls == 1
+        assert [(m.content, m.recipient) for m in sent] == [
+            ("First task", "echo2"), ("Second task", "echo1")
+        ]
+
+    @pytest.mark.asyncio
+    async def test_agent_pool_and_pending_tasks_keep_list_and_dict_api(self):
+        """Test that available_agents edits are used and pending_tasks acts as a dict."""
+        provider = FakeLLMProvider(reply="echo2")
+        coordinator = CoordinatorAgent(available_agents=["echo1"], llm_provider=provider)
+        sent = []
+
+        async def capture(message):
+            sent.append(message)
+
+        coordinator.set_message_callback(capture)
+        coordinator.available_agents.append("echo2")
+
+        task = Message(type=MessageType.TASK, sender="user", content="Do it")
+        await coordinator.process_message(task)
+
+        assert sent[-1].recipient == "echo2"
+        [(delegated_id, original)] = coordinator.pending_tasks.items()
+        assert delegated_id == sent[-1].id
+        assert original is task
+        assert coordinator.pending_tasks.get("unknown") is None
+        assert list(coordinator.pending_tasks) == [delegated_id]
+
+    @pytest.mark.asyncio
+    async def test_no_available_agents_sends_error(self):
+        """Test that an LLM-routed task with no agents gets an ERROR reply."""
+        coordinator = CoordinatorAgent(
+            available_agents=[], llm_provider=FakeLLMProvider(reply="echo1")
+        )
+        sent = []
+
+        async def capture(message):
+            sent.append(message)
+
+        coordinator.set_message_callback(capture)
+
+        task = Message(type=MessageType.TASK, sender="user", content="Do it")
+        await coordinator.process_message(task)
+
+        assert [(m.type, m.recipient) for m in sent] == [
+            (MessageType.ERROR, "user")
+        ]
+        assert sent[0].metadata["in_reply_to"] == task.id
+        assert len(coordinator.pending_tasks) == 0
+
+
+class TestResponseCache:
+    """Test the LLM ResponseCache."""
+
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_call(self):
+        """Test that concurrent and repeated identical requests call once."""
+        from agentic_playground.llm import LLMMessage
+        from agentic_playground.llm.base import ResponseCache
+
+        cache = ResponseCache(max_size=2)
+        calls = 0
+
+        async def create():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return LLMResponse(content="hi", model="fake")
+
+        key = cache.make_key(
+            "fake", [LLMMessage(role="user", content="Hello")], 0.7, 1024, {}
+        )
+        first, second = await asyncio.gather(
+            cache.get_or_create(key, create), cache.get_or_create(key, create)
+        )
+        third = await cache.get_or_create(key, create)
+
+        assert calls == 1
+        assert first.content == second.content == third.content == "hi"
+        assert first is not third
+
+    @pytest.mark.asyncio
+    async def test_failed_request_is_not_cached(self):
+        """Test that an error reaches the caller and isn't cached."""
+        from agentic_playground.llm.base import ResponseCache
+
+        cache = ResponseCache()
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_create("k", fail)
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_timed_out_caller_does_not_cancel_other_waiters(self):
+        """Test that one caller timing out leaves the shared call running."""
+        from agentic_playground.llm.base import ResponseCache
+
+        cache = ResponseCache()
+        calls = 0
+
+        async def create():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.1)
+            return LLMResponse(content="hi", model="fake")
+
+        # The first caller starts the call, then times out while waiting
+        first = asyncio.create_task(
+            asyncio.wait_for(cache.get_or_create("k", create), 0.02)
+        )
+        await asyncio.sleep(0)
+        second = asyncio.create_task(cache.get_or_create("k", create))
+
+        with pytest.raises(asyncio.TimeoutError):
+            await first
+        response = await second
+
+        assert response.content == "hi"
+        assert calls == 1
+        assert len(cache) == 1
+
+
+class TestProviders:
+    """Test LLM provider setup."""
+
+    @pytest.mark.asyncio
+    async def test_providers_share_client_per_api_key(self):
+        """Test that providers with the same key reuse one HTTP client."""
+        from agentic_playground.llm import AnthropicProvider, close_all_clients
+
+        first = AnthropicProvider(api_key="test-key")
+        second = AnthropicProvider(api_key="test-key")
+        other = AnthropicProvider(api_key="other-key")
+
+        assert first.client is second.client
+        assert first.client is not other.client
+
+        client = first.client
+        await close_all_clients()
+        assert first.client is not client
+        await close_all_clients()
+
+    def test_each_event_loop_gets_its_own_client(self):
+        """Test that a client bound to a finished loop is not reused."""
+        from agentic_playground.llm import AnthropicProvider, close_all_clients
+
+        provider = AnthropicProvider(api_key="test-key")
+
+        async def get_client():
+            client = provider.client
+            assert provider.client is client
+            return client
+
+        async def get_and_close():
+            client = await get_client()
+            await close_all_clients()
+            return client
+
+        first = asyncio.run(get_client())
+        second = asyncio.run(get_and_close())
+
+        assert first is not second
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,540 @@
+"""
+Tests for the memory system.
+"""
+
+import asyncio
+
+import pytest
+from agentic_playground import AgentConfig, Message, MessageType, Orchestrator
+from agentic_playground.agents import EchoAgent
+from agentic_playground.core import LLMAgent
+from agentic_playground.memory import MemoryManager, SQLiteStorage
+
+from tests.helpers import FakeLLMProvider
+
+
+@pytest.fixture
+async def memory_manager(tmp_path):
+    """A MemoryManager backed by a temporary SQLite database."""
+    storage = SQLiteStorage(str(tmp_path / "sessions.db"))
+    await storage.initialize()
+    yield MemoryManager(storage)
+    await storage.close()
+
+
+class TestConversationPersistence:
+    """Test persistence of LLM conversation entries."""
+
+    @pytest.mark.asyncio
+    async def test_running_agent_flushes_entries_on_stop(self, memory_manager):
+        """Test that batched conversation entries are written by stop()."""
+        session_id = await memory_manager.create_session()
+        config = AgentConfig(name="bot", role="Test")
+        agent = LLMAgent(
+            config,
+            FakeLLMProvider(reply="Hi there"),
+            enable_memory_retrieval=False,
+        )
+        agent.set_memory_manager(memory_manager, session_id)
+
+        async def discard(message):
+            pass
+
+        agent.set_message_callback(discard)
+
+        task = asyncio.create_task(agent.start())
+        await agent.receive_message(Message(
+            type=MessageType.QUERY, sender="user", content="Hello"
+        ))
+        await asyncio.sleep(0.05)
+        await agent.stop()
+        await asyncio.wait_for(task, timeout=1.0)
+
+        history = await memory_manager.get_conversation_history("bot", session_id)
+        assert [entry.role for entry in history] == ["user", "assistant"]
+        assert history[1].content == "Hi there"
+
+
+class TestMessagePersistence:
+    """Test persistence of messages routed by the orchestrator."""
+
+    @pytest.mark.asyncio
+    async def test_routed_messages_are_persisted_in_order(self, memory_manager):
+        """Test that batched routed messages are all stored by stop()."""
+        session_id = await memory_manager.create_session()
+        orchestrator = Orchestrator()
+        orchestrator.register_agent(EchoAgent(name="echo1"))
+        orchestrator.attach_memory_manager(memory_manager, session_id)
+
+        async with orchestrator:
+            for i in range(3):
+                await orchestrator._handle_message(Message(
+                    type=MessageType.TASK,
+                    sender="user",
+                    recipient="echo1",
+                    content=f"Task {i}",
+                ))
+            await asyncio.sleep(0.05)
+
+        stored = await memory_manager.get_messages(session_id)
+        assert [m.content for m in stored if m.sender == "user"] == [
+            "Task 0", "Task 1", "Task 2"
+        ]
+        assert len(stored) == 6
+
+    @pytest.mark.asyncio
+    async def test_restore_session_keeps_ids_and_timestamps(self, memory_manager):
+        """Test that restored history keeps the stored ids, timestamps and types."""
+        session_id = await memory_manager.create_session()
+        orchestrator = Orchestrator()
+        orchestrator.attach_memory_manager(memory_manager, session_id)
+        routed = Message(
+            type=MessageType.ERROR, sender="echo1", recipient="user", content="Oops"
+        )
+        await orchestrator._handle_message(routed)
+        # Routing the same message again doesn't fail or duplicate its row
+        await orchestrator._handle_message(routed)
+
+        stored = await memory_manager.get_messages(session_id)
+        restored = Orchestrator()
+        restored.attach_memory_manager(memory_manager)
+        await restored.restore_session(session_id)
+
+        # Yielding can be turned off without breaking the restore
+        restored.restore_yield_every = 0
+        await restored.restore_session(session_id)
+
+        [msg] = restored.message_history
+        assert msg.id == stored[0].id == routed.id
+        assert msg.timestamp == stored[0].timestamp == routed.timestamp
+        assert msg.type == MessageType.STATUS
+
+
+class TestMemoryStorage:
+    """Test storing and retrieving agent memories."""
+
+    @pytest.mark.asyncio
+    async def test_bulk_stored_memories_are_searchable(self, memory_manager):
+        """Test that store_memories_bulk returns ids and indexes every memory."""
+        from agentic_playground.memory import MemoryType
+
+        session_id = await memory_manager.create_session()
+        ids = await memory_manager.store_memories_bulk([
+            {
+                "agent_id": "bot",
+                "session_id": session_id,
+                "content": content,
+                "memory_type": MemoryType.SEMANTIC,
+            }
+            for content in ("Paris is in France", "Berlin is in Germany")
+        ])
+
+        assert len(set(ids)) == 2
+        found = await memory_manager.retrieve_memories("bot", "Germany")
+        assert [m.content for m in found] == ["Berlin is in Germany"]
+        assert found[0].id == ids[1]
+
+    @pytest.mark.asyncio
+    async def test_retrieval_updates_access_for_every_result(self, memory_manager):
+        """Test that each retrieved memory has its access count bumped."""
+        from agentic_playground.memory import MemoryType
+
+        session_id = await memory_manager.create_session()
+        await memory_manager.store_memories_bulk([
+            {
+                "agent_id": "bot",
+                "session_id": session_id,
+                "content": content,
+                "memory_type": MemoryType.SEMANTIC,
+            }
+            for content in ("Paris is a city", "Berlin is a city", "Rhine is a river")
+        ])
+
+        await memory_manager.retrieve_memories("bot", "city")
+        await memory_manager.retrieve_memories("bot", "city")
+
+        counts = {m.content: m.access_count for m in await memory_manager.list_memories("bot")}
+        assert counts == {"Paris is a city": 2, "Berlin is a city": 2, "Rhine is a river": 0}
+
+    @pytest.mark.asyncio
+    async def test_list_sessions_pages_with_after(self, memory_manager):
+        """Test that keyset paging visits every session once, newest first."""
+        created = [await memory_manager.create_session() for _ in range(5)]
+
+        pages = []
+        after = None
+        while True:
+            page = await memory_manager.list_sessions(limit=2, after=after)
+            if not page:
+                break
+            pages.append([s.session_id for s in page])
+            after = page[-1]
+
+        assert [len(page) for page in pages] == [2, 2, 1]
+        listed = [session_id for page in pages for session_id in page]
+        assert sorted(listed) == sorted(created)
+        assert listed == [s.session_id for s in await memory_manager.list_sessions()]
+
+    @pytest.mark.asyncio
+    async def test_fetch_limits_are_capped(self, memory_manager):
+        """Test that oversized limits stop at the manager's cap but None returns all."""
+        memory_manager.max_message_limit = 3
+        session_id = await memory_manager.create_session()
+        await memory_manager.store_messages_bulk([
+            {"session_id": session_id, "sender": "user", "content": f"msg {i}"}
+            for i in range(5)
+        ])
+        for i in range(5):
+            await memory_manager.store_conversation_entry(
+                agent_id="bot", session_id=session_id, role="user", content=f"turn {i}"
+            )
+
+        messages = await memory_manager.get_messages(session_id, limit=50)
+        history = await memory_manager.get_conversation_history("bot", session_id, limit=50)
+
+        assert len(messages) == 3
+        assert [e.content for e in history] == ["turn 2", "turn 3", "turn 4"]
+        assert len(await memory_manager.get_messages(session_id)) == 5
+        assert len(await memory_manager.get_conversation_history("bot", session_id)) == 5
+        streamed = [m async for m in memory_manager.iter_messages(session_id)]
+        assert len(streamed) == 5
+
+    @pytest.mark.asyncio
+    async def test_session_lookups_are_cached_until_written(self, memory_manager):
+        """Test that repeated get_session calls hit storage once per change."""
+        session_id = await memory_manager.create_session(metadata={"user": "alice"})
+        storage_get = memory_manager.storage.get_session
+        calls = []
+
+        async def counting_get(sid):
+            calls.append(sid)
+            return await storage_get(sid)
+
+        memory_manager.storage.get_session = counting_get
+
+        first = await memory_manager.get_session(session_id)
+        first.metadata["user"] = "mallory"
+        second = await memory_manager.get_session(session_id)
+        assert len(calls) == 1
+        assert second.metadata["user"] == "alice"
+
+        await memory_manager.store_message(session_id=session_id, sender="user", content="hi")
+        third = await memory_manager.get_session(session_id)
+        assert len(calls) == 2
+        assert third.last_active > second.last_active
+
+    @pytest.mark.asyncio
+    async def test_database_uses_wal(self, memory_manager):
+        """Test that the connection pragmas are applied on initialize."""
+        async with memory_manager.storage.db.execute("PRAGMA journal_mode") as cursor:
+            (mode,) = await cursor.fetchone()
+
+        assert mode == "wal"
+
+    @pytest.mark.asyncio
+    async def test_message_counts_for_several_sessions(self, memory_manager):
+        """Test that get_message_counts counts each session, including empty ones."""
+        busy = await memory_manager.create_session()
+        empty = await memory_manager.create_session()
+        await memory_manager.store_messages_bulk([
+            {"session_id": busy, "sender": "user", "content": f"msg {i}"}
+            for i in range(3)
+        ])
+
+        counts = await memory_manager.get_message_counts([busy, empty])
+
+        assert counts == {busy: 3, empty: 0}
+
+    @pytest.mark.asyncio
+    async def test_list_and_stats_without_search(self, memory_manager):
+        """Test listing memories and aggregate stats without an FTS query."""
+        session_id = await memory_manager.create_session()
+        await memory_manager.store_memories_bulk([
+            {"agent_id": "bot", "session_id": session_id,
+             "content": "Paris is in France", "importance_score": 0.4},
+            {"agent_id": "bot", "session_id": session_id,
+             "content": "Berlin is in Germany", "importance_score": 0.8},
+        ])
+        await memory_manager.retrieve_memories("bot", "Berlin")
+
+        listed = await memory_manager.list_memories("bot")
+        stats = await memory_manager.get_memory_stats("bot")
+
+        assert len(listed) == 2
+        assert stats["total_memories"] == 2
+        assert stats["total_accesses"] == 1
+        assert stats["avg_importance"] == pytest.approx(0.6)
+        assert stats["most_accessed"].content == "Berlin is in Germany"
+
+    @pytest.mark.asyncio
+    async def test_default_memory_stats_match_backend(self, memory_manager):
+        """Test that the base get_memory_stats agrees with SQLite's override."""
+        from agentic_playground.memory.storage import StorageBackend
+
+        session_id = await memory_manager.create_session()
+        await memory_manager.store_memories_bulk([
+            {"agent_id": "bot", "session_id": session_id,
+             "content": "Paris is in France", "importance_score": 0.4},
+            {"agent_id": "bot", "session_id": session_id,
+             "content": "Berlin is in Germany", "importance_score": 0.8},
+        ])
+        await memory_manager.retrieve_memories("bot", "Berlin")
+
+        storage = memory_manager.storage
+        default = await StorageBackend.get_memory_stats(storage, "bot")
+        expected = await storage.get_memory_stats("bot")
+
+        assert "list_memories" not in StorageBackend.__abstractmethods__
+        assert "get_memory_stats" not in StorageBackend.__abstractmethods__
+        assert default["total_memories"] == expected["total_memories"]
+        assert default["total_accesses"] == expected["total_accesses"]
+        assert default["avg_importance"] == pytest.approx(expected["avg_importance"])
+        assert default["most_accessed"].id == expected["most_accessed"].id
+        assert await StorageBackend.get_memory_stats(storage, "nobody") == {
+            "total_memories": 0,
+            "total_accesses": 0,
+            "avg_importance": 0.0,
+            "most_accessed": None,
+        }
+
+    @pytest.mark.asyncio
+    async def test_search_ranks_by_relevance(self, memory_manager):
+        """Test that relevance_weight blends FTS relevance with importance."""
+        session_id = await memory_manager.create_session()
+        await memory_manager.store_memories_bulk([
+            {"agent_id": "bot", "session_id": session_id,
+             "content": "Python tips, and a note on general style for python users of python",
+             "importance_score": 0.2},
+            {"agent_id": "bot", "session_id": session_id,
+             "content": "Project notes mention python once among many other unrelated topics",
+             "importance_score": 0.9},
+        ])
+
+        found = await memory_manager.retrieve_memories("bot", "python")
+        by_importance = await memory_manager.retrieve_memories(
+            "bot", "python", relevance_weight=0.0
+        )
+
+        assert found[0].importance_score == 0.2
+        assert by_importance[0].importance_score == 0.9
+
+
+class TestQueryEngine:
+    """Test query preprocessing and keyword extraction."""
+
+    @pytest.mark.asyncio
+    async def test_search_recent_only_returns_current_session(self, memory_manager):
+        """Test that search_recent filters by session in storage."""
+        from agentic_playground.memory import MemoryType
+        from agentic_playground.memory.query import QueryEngine
+
+        current = await memory_manager.create_session()
+        other = await memory_manager.create_session()
+        await memory_manager.store_memories_bulk([
+            {
+                "agent_id": "bot",
+                "session_id": session_id,
+                "content": f"Deploy notes from {label}",
+                "memory_type": MemoryType.EPISODIC,
+            }
+            for session_id, label in ((current, "today"), (other, "yesterday"))
+        ])
+
+        found = await QueryEngine(memory_manager).search_recent("bot", "deploy", current)
+
+        assert [m.content for m in found] == ["Deploy notes from today"]
+
+    @pytest.mark.asyncio
+    async def test_extract_keywords_is_cached_per_text(self, memory_manager):
+        """Test that repeated extraction is cached but returns fresh lists."""
+        from agentic_playground.memory.query import QueryEngine
+
+        engine = QueryEngine(memory_manager)
+        text = "Python testing, python packaging and testing with pytest"
+
+        first = engine.extract_keywords(text, top_k=2)
+        first.append("extra")
+        second = engine.extract_keywords(text, top_k=2)
+
+        assert second == ["python", "testing"]
+
+
+class TestContextManager:
+    """Test context window pruning."""
+
+    def test_prune_keeps_as_many_messages_as_fit(self):
+        """Test that pruning keeps the largest prefix of the ranking that fits."""
+        from agentic_playground.memory.context import ContextManager
+        from agentic_playground.memory.utils.tokens import estimate_tokens_for_messages
+
+        messages = [{"role": "system", "content": "You are helpful."}] + [
+            {"role": "user" if i % 2 else "assistant", "content": f"message {i} " * 20}
+            for i in range(40)
+        ]
+        manager = ContextManager(max_tokens=900, buffer_tokens=100, always_keep_recent=4)
+
+        window = manager.prepare_context(messages)
+
+        assert window.pruned_count > 0
+        assert window.messages[0]["role"] == "system"
+        assert window.messages[-4:] == messages[-4:]
+        assert window.total_tokens == estimate_tokens_for_messages(window.messages)
+        assert window.total_tokens <= manager.effective_max_tokens
+        # Keeping one more message would have exceeded the budget
+        per_message = estimate_tokens_for_messages(messages[1:2]) - 5
+        assert window.total_tokens + per_message > manager.effective_max_tokens
+
+    def test_memories_fill_remaining_budget(self):
+        """Test that memories are added within budget and returned as Memory objects."""
+        from agentic_playground.memory.context import ContextManager
+        from agentic_playground.memory.models import Memory, MemoryType
+        from agentic_playground.memory.utils.tokens import estimate_tokens_for_messages
+
+        messages = [
+            {"role": "user" if i % 2 else "assistant", "content": f"message {i} " * 20}
+            for i in range(8)
+        ]
+        memories = [
+            Memory(
+                agent_id="agent",
+                session_id="session",
+                memory_type=MemoryType.SEMANTIC,
+                content=f"fact {i} " * 30,
+                embedding_text=f"fact {i}",
+            ).model_dump()
+            for i in range(10)
+        ]
+        manager = ContextManager(max_tokens=900, buffer_tokens=100, always_keep_recent=4)
+
+        window = manager.prepare_context(messages, memories=memories)
+
+        assert 0 < len(window.retrieved_memories) < len(memories)
+        assert all(isinstance(m, Memory) for m in window.retrieved_memories)
+        assert window.total_tokens == estimate_tokens_for_messages(window.messages)
+        assert window.total_tokens <= manager.effective_max_tokens
+
+
+    @pytest.mark.asyncio
+    async def test_prepare_context_with_storage_adds_memories(self, memory_manager):
+        """Test that stored history and queried memories are combined."""
+        from agentic_playground.memory import MemoryType
+        from agentic_playground.memory.context import ContextManager
+
+        session_id = await memory_manager.create_session()
+        await memory_manager.store_conversation_entry(
+            agent_id="bot", session_id=session_id, role="user", content="Where is Berlin?"
+        )
+        await memory_manager.store_memory(
+            agent_id="bot",
+            session_id=session_id,
+            content="Berlin is in Germany",
+            memory_type=MemoryType.SEMANTIC,
+        )
+
+        window = await ContextManager().prepare_context_with_storage(
+            "bot", session_id, memory_manager, memory_query="Berlin"
+        )
+
+        assert [m.content for m in window.retrieved_memories] == ["Berlin is in Germany"]
+        assert window.messages[-1]["content"] == "Where is Berlin?"
+        assert "Berlin is in Germany" in window.messages[0]["content"]
+
+
+class TestImportance:
+    """Test importance-based pruning selection."""
+
+    @staticmethod
+    def _conversation(timestamp=None):
+        """A system prompt, one important message and identical plain ones."""
+        def msg(role, content):
+            message = {"role": role, "content": content}
+            if timestamp is not None:
+                message["timestamp"] = timestamp
+            return message
+
+        return [
+            msg("system", "You are helpful."),
+            msg("assistant", "ok"),
+            msg("assistant", "Critical error: the build failed"),
+            msg("assistant", "ok"),
+            msg("assistant", "ok"),
+            msg("assistant", "ok"),
+            msg("user", "ok"),
+            msg("user", "ok"),
+        ]
+
+    def test_nothing_pruned_within_keep_count(self):
+        """Test that no message is pruned when they all fit."""
+        from agentic_playground.memory.importance import select_messages_to_prune
+
+        assert select_messages_to_prune(self._conversation(), keep_count=8) == []
+
+    def test_keeps_important_and_earliest_of_tied_messages(self):
+        """Test that the most important messages are kept, ties by position."""
+        from datetime import datetime, timedelta
+
+        from agentic_playground.memory.importance import select_messages_to_prune
+
+        timestamp = datetime.utcnow() - timedelta(hours=1)
+        for messages in (self._conversation(timestamp), self._conversation()):
+            pruned = select_messages_to_prune(
+                messages, keep_count=5, always_keep_recent=2
+            )
+
+            # System and the 2 most recent are protected, leaving 2 slots:
+            # the critical message and the first of the tied plain ones
+            assert pruned == [3, 4, 5]
+
+    def test_protected_messages_exceeding_keep_count(self):
+        """Test that every unprotected message goes when protection fills the budget."""
+        from agentic_playground.memory.importance import select_messages_to_prune
+
+        messages = self._conversation()
+
+        assert select_messages_to_prune(
+            messages, keep_count=3, always_keep_recent=2
+        ) == [1, 2, 3, 4, 5]
+        assert select_messages_to_prune(
+            messages, keep_count=2, always_keep_recent=2, always_keep_system=False
+        ) == [0, 1, 2, 3, 4, 5]
+
+    def test_system_messages_can_be_pruned_when_not_protected(self):
+        """Test that always_keep_system=False ranks system messages like the rest."""
+        from agentic_playground.memory.importance import select_messages_to_prune
+
+        pruned = select_messages_to_prune(
+            self._conversation(), keep_count=4, always_keep_recent=2,
+            always_keep_system=False,
+        )
+
+        # The two kept slots go to the system prompt and the critical message
+        assert pruned == [1, 3, 4, 5]
+
+
+class TestSQLiteStorage:
+    """Test SQLiteStorage connection handling."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_reads_use_reader_pool(self, memory_manager):
+        """Test that reads see committed writes and return their readers."""
+        storage = memory_manager.storage
+        session_id = await memory_manager.create_session()
+
+        sessions = await asyncio.gather(
+            *(memory_manager.get_session(session_id) for _ in range(8))
+        )
+
+        assert all(s.session_id == session_id for s in sessions)
+        assert len(storage._idle_readers) == storage.max_readers
+
+    @pytest.mark.asyncio
+    async def test_in_memory_database_reads_through_writer(self):
+        """Test that an in-memory database works without reader connections."""
+        storage = SQLiteStorage(":memory:")
+        await storage.initialize()
+        try:
+            manager = MemoryManager(storage)
+            session_id = await manager.create_session()
+            assert await manager.get_session(session_id) is not None
+        finally:
+            await storage.close()